@@ -2,6 +2,6 @@
 Package initialization file for applications module.
 """
 
-from .router import router as applications_router
+from .router import build_router as build_applications_router
 
-__all__ = ["applications_router"]
\ No newline at end of file
+__all__ = ["build_applications_router"]
\ No newline at end of file
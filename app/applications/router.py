@@ -1,229 +1,590 @@
 """
 Application routes.
+
+The v1 and v2 APIs share one implementation; they only differ in a few
+paths and in how the status update receives its value, see PATHS.
 """
 
-from fastapi import APIRouter, Depends, HTTPException,status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
-from .. import crud, schemas
-from ..deps import get_db
-from ..auth.security import get_current_user, get_current_admin
-from fastapi import File,UploadFile
-
-
-router = APIRouter(prefix="/applications", tags=["applications"])
-
-# ------------------- Applicant Endpoints -------------------
-@router.post("/", response_model=schemas.ApplicationOut)
-def create_application(
-    app_data: schemas.ApplicationCreate,
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
-):
-    """
-    Create a new housing application (Applicant only).
-    """
-    return crud.create_application(db, app_data, user_id=current_user.id)
-
-
-# Add NextOfKin
-@router.post("/{application_id}/next-of-kin", response_model=schemas.NextOfKinOut)
-def add_next_of_kin(
-    application_id: int,
-    kin: schemas.NextOfKinCreate,
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
-):
-    app = crud.get_application_by_id(db, application_id)
-    if not app or app.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    return crud.add_next_of_kin(db, kin, application_id,actor_user_id=current_user.id)
-
-
-# Add Spouse
-@router.post("/{application_id}/spouse", response_model=schemas.SpouseOut)
-def add_spouse(
-    application_id: int,
-    spouse: schemas.SpouseCreate,
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
-):
-    app = crud.get_application_by_id(db, application_id)
-    if not app or app.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    return crud.add_spouse(db, spouse, application_id,actor_user_id=current_user.id)
-
-
-# Add Beneficiary
-@router.post("/{application_id}/beneficiaries", response_model=schemas.BeneficiaryOut)
-def add_beneficiary(
-    application_id: int,
-    beneficiary: schemas.BeneficiaryCreate,
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
-):
-    app = crud.get_application_by_id(db, application_id)
-    if not app or app.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    return crud.add_beneficiary(db, beneficiary, application_id,actor_user_id=current_user.id)
-
-
-# Add Payment
-@router.post("/{application_id}/payments", response_model=schemas.PaymentOut)
-def add_payment(
-    application_id: int,
-    payment: schemas.PaymentCreate,
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
-):
-    app = crud.get_application_by_id(db, application_id)
-    if not app or app.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    return crud.add_payment(db, payment, application_id,actor_user_id=current_user.id)
-
-
-@router.get("/my", response_model=List[schemas.ApplicationOut])
-def get_my_applications(
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
-):
-    """
-    Get all applications submitted by the logged-in user.
-    """
-    return crud.get_applications_by_user(db, user_id=current_user.id)
-
-
-@router.get("/{application_id}", response_model=schemas.ApplicationOut)
-def get_application_detail(
-    application_id: int,
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
-):
-    """
-    Get details of one application (only if owned by user).
-    """
-    app = crud.get_application_by_id(db, application_id)
-    if not app:
-        raise HTTPException(status_code=404, detail="Application not found")
-    if app.user_id != current_user.id and current_user.role != "ADMIN":
-        raise HTTPException(status_code=403, detail="Not authorized to view this application")
-    return app
-
-
-# ------------------- Admin Endpoints -------------------
-@router.get("/admin/all", response_model=List[schemas.ApplicationOut])
-def list_all_applications(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
-    current_admin=Depends(get_current_admin),
-):
-    """
-    List all applications (Admin only).
-    """
-    return crud.list_all_applications(db, skip=skip, limit=limit)
-
-
-@router.put("/admin/{application_id}/status", response_model=schemas.ApplicationOut)
-def update_application_status(
-    application_id: int,
-    status: str,  # expects "APPROVED" or "REJECTED"
-    db: Session = Depends(get_db),
-    current_admin=Depends(get_current_admin),
-):
-    """
-    Approve or reject an application (Admin only).
-    """
-    app = crud.update_application_status(db, application_id, status,actor_user_id=current_user.id)
-    if not app:
-        raise HTTPException(status_code=404, detail="Application not found")
-    return app
-
-@router.get("/logs", response_model=List[schemas.AuditLogOut])
-def get_audit_logs(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
-    current_admin = Depends(get_current_admin),
-):
-    return crud.list_audit_logs(db, skip=skip, limit=limit)
-
-@router.get("/applications/{application_id}/logs", response_model=List[schemas.AuditLogOut])
-def get_application_logs(
-    application_id: int,
-    db: Session = Depends(get_db),
-    current_admin = Depends(get_current_admin),
-):
-    return crud.list_audit_logs_for_application(db, application_id)
-
-
-# ------------------- Documents -------------------
-@router.post("/{application_id}/documents", response_model=schemas.DocumentOut)
-def upload_document(
-    application_id: int,
-    kind: str,
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
-):
-    """
-    Upload a document (ID_SCAN, PROOF_OF_RESIDENCE, PAYSLIP, SIGNATURE).
-    Stores file and metadata.
-    """
-    app = crud.get_application_by_id(db, application_id)
-    if not app or app.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized")
-
-    return crud.add_document(db, application_id, file, kind,actor_user_id=current_user.id)
-
-
-@router.get("/{application_id}/documents", response_model=List[schemas.DocumentOut])
-def list_documents(
-    application_id: int,
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
-):
-    """
-    List uploaded documents for an application.
-    """
-    app = crud.get_application_by_id(db, application_id)
-    if not app or (app.user_id != current_user.id and current_user.role != "ADMIN"):
-        raise HTTPException(status_code=403, detail="Not authorized")
-
-    return crud.get_documents_by_application(db, application_id)
-
-
-# ---- Update application (Applicant can only update their own, Admin can update any) ----
-@router.put("/{application_id}", response_model=schemas.ApplicationOut)
-def update_application(application_id: int, app_update: schemas.ApplicationUpdate,
-                       db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    app = db.query(Application).filter(Application.id == application_id).first()
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+from typing import List, Optional
+import asyncio
+import os
+import re
+from urllib.parse import quote
+from .. import crud, events, schemas, models, storage
+from ..conditional import is_not_modified, make_etag, not_modified, parse_range, validator_headers
+from ..config import EVENTS_HEARTBEAT_SECONDS
+from ..db import SessionLocal
+from ..deps import get_db, get_read_db
+from ..serialization import list_response, parse_fields
+from ..auth.security import get_current_user, get_current_admin, get_stream_user
+from fastapi import File, UploadFile
+
+
+PATHS = {
+    1: {
+        "my": "/me",
+        "admin_all": "/",
+        "status": "/{application_id}/status",
+        "bulk_status": "/status/bulk",
+        "purge": "/purge",
+        "changes": "/changes",
+    },
+    2: {
+        "my": "/my",
+        "admin_all": "/admin/all",
+        "status": "/admin/{application_id}/status",
+        "bulk_status": "/admin/status/bulk",
+        "purge": "/admin/purge",
+        "changes": "/admin/changes",
+    },
+}
+
+
+def _set_status(db: Session, application_id: int, status: str, current_admin, expected_version: Optional[int] = None):
+    if status not in ["PENDING", "APPROVED", "REJECTED"]:
+        raise HTTPException(status_code=400, detail="Invalid status")
+
+    try:
+        app = crud.update_application_status(
+            db, application_id, status, actor_user_id=current_admin.id, expected_version=expected_version
+        )
+    except crud.InvalidStatusTransition as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    except crud.StaleApplication:
+        raise HTTPException(status_code=409, detail="Application was changed by someone else; reload and retry")
     if not app:
         raise HTTPException(status_code=404, detail="Application not found")
-
-    if current_user.role != "ADMIN" and app.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to update this application")
-
-    for key, value in app_update.dict(exclude_unset=True).items():
-        setattr(app, key, value)
-
-    db.commit()
-    db.refresh(app)
     return app
 
 
-# ---- Delete application ----
-@router.delete("/{application_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_application(application_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    app = db.query(Application).filter(Application.id == application_id).first()
-    if not app:
-        raise HTTPException(status_code=404, detail="Application not found")
-
-    if current_user.role != "ADMIN" and app.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to delete this application")
-
-    db.delete(app)
-    db.commit()
-    return
-
-    
\ No newline at end of file
+def _content_disposition(filename: str) -> str:
+    """inline, with an ASCII-safe filename and the exact one as RFC 5987 filename*."""
+    fallback = re.sub(r"[^A-Za-z0-9._-]", "_", filename)
+    return f"inline; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+
+def _missed_events(user_id: int, after_id: int):
+    db = SessionLocal()
+    try:
+        return crud.list_status_events(db, user_id, after_id)
+    finally:
+        db.close()
+
+
+def build_router(version: int = 1) -> APIRouter:
+    """Build the applications router for the given API version."""
+    paths = PATHS[version]
+    router = APIRouter(prefix="/applications", tags=["applications"])
+
+    # ------------------- Applicant Endpoints -------------------
+    @router.post("/", response_model=schemas.ApplicationOut)
+    def create_application(
+        app_data: schemas.ApplicationCreate,
+        db: Session = Depends(get_db),
+        current_user=Depends(get_current_user),
+    ):
+        """
+        Create a new housing application (Applicant only).
+        """
+        return crud.create_application(db, app_data, user_id=current_user.id)
+
+
+    @router.post("/submit", response_model=schemas.ApplicationFullOut)
+    def submit_full_application(
+        app_data: schemas.ApplicationSubmit,
+        db: Session = Depends(get_db),
+        current_user=Depends(get_current_user),
+    ):
+        """
+        Submit an application with next of kin, spouse, beneficiaries and
+        payments in one atomic request (Applicant only).
+        """
+        try:
+            return crud.submit_full_application(db, app_data, user_id=current_user.id)
+        except IntegrityError:
+            raise HTTPException(status_code=409, detail="Receipt number already recorded")
+
+
+    # Add NextOfKin
+    @router.post("/{application_id}/next-of-kin", response_model=schemas.NextOfKinOut)
+    def add_next_of_kin(
+        application_id: int,
+        kin: schemas.NextOfKinCreate,
+        db: Session = Depends(get_db),
+        current_user=Depends(get_current_user),
+    ):
+        app = crud.get_application_by_id(db, application_id)
+        if not app or app.user_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Not authorized")
+        return crud.add_next_of_kin(db, kin, application_id,actor_user_id=current_user.id)
+
+
+    # Add Spouse
+    @router.post("/{application_id}/spouse", response_model=schemas.SpouseOut)
+    def add_spouse(
+        application_id: int,
+        spouse: schemas.SpouseCreate,
+        db: Session = Depends(get_db),
+        current_user=Depends(get_current_user),
+    ):
+        app = crud.get_application_by_id(db, application_id)
+        if not app or app.user_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Not authorized")
+        return crud.add_spouse(db, spouse, application_id,actor_user_id=current_user.id)
+
+
+    # Add Beneficiary
+    @router.post("/{application_id}/beneficiaries", response_model=schemas.BeneficiaryOut)
+    def add_beneficiary(
+        application_id: int,
+        beneficiary: schemas.BeneficiaryCreate,
+        db: Session = Depends(get_db),
+        current_user=Depends(get_current_user),
+    ):
+        app = crud.get_application_by_id(db, application_id)
+        if not app or app.user_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Not authorized")
+        return crud.add_beneficiary(db, beneficiary, application_id,actor_user_id=current_user.id)
+
+
+    # Add Payment
+    @router.post("/{application_id}/payments", response_model=schemas.PaymentOut)
+    def add_payment(
+        application_id: int,
+        payment: schemas.PaymentCreate,
+        db: Session = Depends(get_db),
+        current_user=Depends(get_current_user),
+    ):
+        app = crud.get_application_by_id(db, application_id)
+        if not app or app.user_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Not authorized")
+        try:
+            return crud.add_payment(db, payment, application_id,actor_user_id=current_user.id)
+        except IntegrityError:
+            raise HTTPException(status_code=409, detail="Receipt number already recorded")
+
+
+    @router.get(paths["my"], response_model=List[schemas.ApplicationOut])
+    def get_my_applications(
+        request: Request,
+        fields: Optional[str] = None,
+        include_position: bool = False,
+        db: Session = Depends(get_read_db),
+        current_user=Depends(get_current_user),
+    ):
+        """
+        Get all applications submitted by the logged-in user.
+        Pass `fields=id,status,...` to return only those fields, and
+        `include_position=true` to add each one's `queue_position`.
+        Without include_position the response carries an ETag and
+        Last-Modified and is revalidated with a 304.
+        """
+        model = schemas.ApplicationWithPosition if include_position else schemas.ApplicationOut
+        fields = parse_fields(model, fields)
+        headers = None
+        # queue positions move when other users' applications change, so
+        # only the plain list can be validated from the user's own rows
+        if not include_position:
+            count, last_modified = crud.applications_list_validators(db, current_user.id)
+            headers = validator_headers(make_etag("my", current_user.id, fields, count, last_modified), last_modified)
+            if is_not_modified(request, headers["ETag"], last_modified):
+                return not_modified(headers)
+        apps = crud.get_applications_by_user(db, user_id=current_user.id, fields=fields, with_position=include_position)
+        return list_response(model, apps, fields, headers=headers)
+
+
+    @router.get("/{application_id}/position", response_model=schemas.QueuePosition)
+    def get_queue_position(
+        application_id: int,
+        db: Session = Depends(get_read_db),
+        current_user=Depends(get_current_user),
+    ):
+        """
+        Position of a pending application in the waiting list (1 is next),
+        for its owner or an admin.
+        """
+        app = crud.get_application_by_id(db, application_id)
+        if not app:
+            raise HTTPException(status_code=404, detail="Application not found")
+        if app.user_id != current_user.id and current_user.role != "ADMIN":
+            raise HTTPException(status_code=403, detail="Not authorized to view this application")
+        position, queue_length = crud.get_waiting_list_position(db, application_id)
+        return {
+            "application_id": app.id,
+            "status": app.status,
+            "council_waiting_list_number": app.council_waiting_list_number,
+            "position": position,
+            "queue_length": queue_length,
+        }
+
+
+    @router.get("/events")
+    async def stream_status_events(
+        request: Request,
+        last_event_id: Optional[int] = None,
+        current_user=Depends(get_stream_user),
+    ):
+        """
+        Server-Sent Events stream of status changes to the user's
+        applications (`event: status`, data `{"application_id", "status"}`).
+        Reconnecting with the Last-Event-ID header (or `last_event_id`)
+        first replays the changes missed since that event. Resume is best
+        effort: event ids follow insert order, not commit order, so a change
+        committed after a later-numbered one can be missed across a
+        reconnect. A `: ping` comment is sent when idle to keep proxies
+        from closing the stream.
+        """
+        header = request.headers.get("last-event-id", "")
+        if header.isdigit():
+            last_event_id = int(header)
+        user_id = current_user.id
+        events.start_listener()
+        # subscribe before replaying so nothing falls between the two
+        queue = events.broker.subscribe(user_id)
+
+        async def stream():
+            replayed = set()
+            try:
+                yield "retry: 3000\n\n"
+                if last_event_id is not None:
+                    for item in await run_in_threadpool(_missed_events, user_id, last_event_id):
+                        replayed.add(item["id"])
+                        yield events.format_event(item)
+                while True:
+                    try:
+                        item = await asyncio.wait_for(queue.get(), EVENTS_HEARTBEAT_SECONDS)
+                    except asyncio.TimeoutError:
+                        if await request.is_disconnected():
+                            return
+                        yield ": ping\n\n"
+                        continue
+                    if item is None:
+                        return  # server shutting down
+                    # ids are not in commit order, so only skip what the replay sent
+                    if item["id"] in replayed:
+                        replayed.discard(item["id"])
+                        continue
+                    yield events.format_event(item)
+            finally:
+                events.broker.unsubscribe(user_id, queue)
+
+        return StreamingResponse(
+            stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+
+    @router.get(paths["changes"], response_model=schemas.ApplicationChanges)
+    def get_application_changes(
+        cursor: Optional[str] = None,
+        limit: int = Query(500, ge=1, le=5000),
+        include_children: bool = False,
+        db: Session = Depends(get_read_db),
+        current_admin=Depends(get_current_admin),
+    ):
+        """
+        Delta sync for dashboards (Admin only). Without a cursor returns
+        every application; afterwards pass the returned `cursor` to get
+        only applications changed since, and the ids of deleted ones.
+        `include_children` adds next of kin, spouse, beneficiaries,
+        documents and payments; a change to any of those counts as a
+        change to the application. 410 means the cursor is too old.
+        """
+        try:
+            apps, deleted, next_cursor, has_more = crud.application_changes(
+                db, cursor, limit=limit, with_children=include_children
+            )
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        except crud.SyncCursorExpired:
+            raise HTTPException(status_code=410, detail="Cursor expired; sync again without a cursor")
+        model = schemas.ApplicationSyncOut if include_children else schemas.ApplicationOut
+        return {
+            "applications": [model.model_validate(app) for app in apps],
+            "deleted": deleted,
+            "cursor": next_cursor,
+            "has_more": has_more,
+        }
+
+
+    # ------------------- Audit Logs -------------------
+    @router.get("/logs", response_model=List[schemas.AuditLogOut])
+    def get_audit_logs(
+        skip: int = 0,
+        limit: int = 100,
+        count: Optional[str] = Query(None, pattern="^(exact|estimated|cached)$"),
+        db: Session = Depends(get_read_db),
+        current_admin = Depends(get_current_admin),
+    ):
+        headers = {"X-Total-Count": str(crud.count_rows(db, models.AuditLog, count))} if count else None
+        return list_response(schemas.AuditLogOut, crud.list_audit_logs(db, skip=skip, limit=limit), headers=headers)
+
+
+    @router.get("/applications/{application_id}/logs", response_model=List[schemas.AuditLogOut])
+    def get_application_logs(
+        application_id: int,
+        db: Session = Depends(get_read_db),
+        current_admin = Depends(get_current_admin),
+    ):
+        return list_response(schemas.AuditLogOut, crud.list_audit_logs_for_application(db, application_id))
+
+
+    @router.get("/{application_id}", response_model=schemas.ApplicationOut)
+    def get_application_detail(
+        application_id: int,
+        request: Request,
+        response: Response,
+        db: Session = Depends(get_db),
+        current_user=Depends(get_current_user),
+    ):
+        """
+        Get details of one application (only if owned by user).
+        Send the ETag back in If-None-Match to get a 304 while unchanged.
+        """
+        current = crud.application_validators(db, application_id)
+        if not current:
+            raise HTTPException(status_code=404, detail="Application not found")
+        if current.user_id != current_user.id and current_user.role != "ADMIN":
+            raise HTTPException(status_code=403, detail="Not authorized to view this application")
+        headers = validator_headers(make_etag("application", application_id, current.version), current.updated_at)
+        if is_not_modified(request, headers["ETag"], current.updated_at):
+            return not_modified(headers)
+        response.headers.update(headers)
+        return crud.get_application_by_id(db, application_id)
+
+
+    # ------------------- Admin Endpoints -------------------
+    @router.get(paths["admin_all"], response_model=List[schemas.ApplicationOut])
+    def list_all_applications(
+        skip: int = 0,
+        limit: int = 100,
+        fields: Optional[str] = None,
+        count: Optional[str] = Query(None, pattern="^(exact|estimated|cached)$"),
+        db: Session = Depends(get_read_db),
+        current_admin=Depends(get_current_admin),
+    ):
+        """
+        List all applications (Admin only).
+        Pass `fields=id,name,surname,...` to return only those fields and
+        `count=exact|estimated|cached` to get an X-Total-Count header.
+        """
+        fields = parse_fields(schemas.ApplicationOut, fields)
+        apps = crud.list_all_applications(db, skip=skip, limit=limit, fields=fields)
+        headers = {"X-Total-Count": str(crud.count_rows(db, models.Application, count))} if count else None
+        return list_response(schemas.ApplicationOut, apps, fields, headers=headers)
+
+
+    if version == 1:
+        @router.put(paths["status"], response_model=schemas.ApplicationOut)
+        def update_application_status(
+            application_id: int,
+            status_data: schemas.StatusUpdate,
+            db: Session = Depends(get_db),
+            current_admin=Depends(get_current_admin),
+        ):
+            """
+            Approve or reject an application (Admin only).
+            Include the `version` you reviewed to get a 409 if it changed since.
+            """
+            return _set_status(db, application_id, status_data.status, current_admin, status_data.version)
+    else:
+        @router.put(paths["status"], response_model=schemas.ApplicationOut)
+        def update_application_status(
+            application_id: int,
+            status: str,  # expects "APPROVED" or "REJECTED"
+            version: Optional[int] = None,
+            db: Session = Depends(get_db),
+            current_admin=Depends(get_current_admin),
+        ):
+            """
+            Approve or reject an application (Admin only).
+            Pass the `version` you reviewed to get a 409 if it changed since.
+            """
+            return _set_status(db, application_id, status, current_admin, version)
+
+
+    @router.post(paths["bulk_status"], response_model=schemas.BulkStatusResult)
+    def bulk_update_application_status(
+        data: schemas.BulkStatusUpdate,
+        db: Session = Depends(get_db),
+        current_admin=Depends(get_current_admin),
+    ):
+        """
+        Change the status of many applications at once, by ID list or filter (Admin only).
+        """
+        if data.status not in ["PENDING", "APPROVED", "REJECTED"]:
+            raise HTTPException(status_code=400, detail="Invalid status")
+
+        updated_ids = crud.bulk_update_application_status(
+            db, data.status, actor_user_id=current_admin.id, ids=data.ids, filters=data.filter
+        )
+        return {"status": data.status, "updated_ids": updated_ids}
+
+    # ------------------- Documents -------------------
+    @router.post("/{application_id}/documents", response_model=schemas.DocumentOut)
+    async def upload_document(
+        application_id: int,
+        kind: str = Query(..., pattern="^[A-Za-z0-9_-]{1,50}$"),
+        file: UploadFile = File(...),
+        db: Session = Depends(get_db),
+        current_user=Depends(get_current_user),
+    ):
+        """
+        Upload a document (ID_SCAN, PROOF_OF_RESIDENCE, PAYSLIP, SIGNATURE).
+        Stores file and metadata (size, content type, sha256).
+        """
+        app = await run_in_threadpool(crud.application_validators, db, application_id)
+        if not app or app.user_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Not authorized")
+
+        stored = await storage.save(file, f"application_{application_id}")
+        return await run_in_threadpool(crud.add_document, db, application_id, kind, stored, actor_user_id=current_user.id)
+
+
+    @router.get("/{application_id}/documents/{document_id}/download")
+    async def download_document(
+        application_id: int,
+        document_id: int,
+        request: Request,
+        db: Session = Depends(get_db),
+        current_user=Depends(get_current_user),
+    ):
+        """
+        Stream a document from storage (owner or admin). Supports Range
+        requests with 206 responses, so PDF viewers can fetch only the
+        pages they show, and If-None-Match against the checksum.
+        """
+        row = await run_in_threadpool(crud.get_document_for_download, db, application_id, document_id)
+        if not row or (row.user_id != current_user.id and current_user.role != "ADMIN"):
+            raise HTTPException(status_code=404, detail="Document not found")
+        document = row.Document
+        await run_in_threadpool(db.close)  # nothing else needs the database while streaming
+
+        size = document.size
+        if size is None:
+            try:
+                size = await storage.size(document.path)
+            except OSError:  # missing, or outside the upload directory
+                raise HTTPException(status_code=404, detail="Document file not found")
+        headers = {
+            "Accept-Ranges": "bytes",
+            # kind and extension came from the client (and older rows were not validated)
+            "Content-Disposition": _content_disposition(
+                f"{(document.kind or 'document').lower()}-{document.id}{os.path.splitext(document.path)[1][:16]}"
+            ),
+        }
+        if document.checksum:
+            headers.update(validator_headers(f'"{document.checksum}"', document.updated_at))
+            if is_not_modified(request, headers["ETag"], document.updated_at):
+                return not_modified(headers)
+
+        # If-Range: only honour Range if the client's copy is still current
+        if_range = request.headers.get("if-range")
+        range_header = request.headers.get("range") if not if_range or if_range == headers.get("ETag") else None
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            raise HTTPException(status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+
+        start, end = byte_range or (0, size - 1)
+        headers["Content-Length"] = str(end - start + 1)
+        if byte_range:
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        return StreamingResponse(
+            storage.read_range(document.path, start, end) if size else iter(()),
+            status_code=206 if byte_range else 200,
+            media_type=document.content_type or "application/octet-stream",
+            headers=headers,
+        )
+
+
+    @router.get("/{application_id}/documents", response_model=List[schemas.DocumentOut])
+    def list_documents(
+        application_id: int,
+        request: Request,
+        db: Session = Depends(get_db),
+        current_user=Depends(get_current_user),
+    ):
+        """
+        List uploaded documents for an application. Revalidate with
+        If-None-Match or If-Modified-Since to get a 304 while unchanged.
+        """
+        app = crud.application_validators(db, application_id)
+        if not app or (app.user_id != current_user.id and current_user.role != "ADMIN"):
+            raise HTTPException(status_code=403, detail="Not authorized")
+
+        count, last_modified = crud.documents_list_validators(db, application_id)
+        headers = validator_headers(make_etag("documents", application_id, count, last_modified), last_modified)
+        if is_not_modified(request, headers["ETag"], last_modified):
+            return not_modified(headers)
+        return list_response(schemas.DocumentOut, crud.get_documents_by_application(db, application_id), headers=headers)
+
+
+    # ---- Update application (Applicant can only update their own, Admin can update any) ----
+    @router.put("/{application_id}", response_model=schemas.ApplicationOut)
+    def update_application(application_id: int, app_update: schemas.ApplicationUpdate,
+                           db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+        app = db.query(models.Application).filter(models.Application.id == application_id).first()
+        if not app:
+            raise HTTPException(status_code=404, detail="Application not found")
+
+        if current_user.role != "ADMIN" and app.user_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Not authorized to update this application")
+
+        requeue = app.status == "PENDING" and "council_waiting_list_number" in app_update.model_fields_set
+        for key, value in app_update.model_dump(exclude_unset=True).items():
+            setattr(app, key, value)
+
+        try:
+            if requeue:
+                db.flush()
+                crud.waiting_list_leave(db, application_id)
+                crud.waiting_list_enter(db, application_id)
+            db.commit()
+        except StaleDataError:
+            db.rollback()
+            raise HTTPException(status_code=409, detail="Application was changed by someone else; reload and retry")
+        db.refresh(app)
+        return app
+
+
+    # ---- Purge old applications ----
+    # registered before DELETE /{application_id}, which would otherwise match v1's /purge
+    @router.delete(paths["purge"], response_model=schemas.PurgeResult)
+    def purge_applications(
+        older_than_days: int = Query(..., ge=1),
+        app_status: str = Query("REJECTED", alias="status", pattern="^(PENDING|APPROVED|REJECTED)$"),
+        db: Session = Depends(get_db),
+        current_admin=Depends(get_current_admin),
+    ):
+        """
+        Delete all applications in a status (REJECTED by default) older than
+        `older_than_days`, with their related records, in batches (Admin only).
+        """
+        deleted = crud.purge_applications(db, app_status, older_than_days, actor_user_id=current_admin.id)
+        return {"deleted": deleted}
+
+
+    # ---- Delete application ----
+    @router.delete("/{application_id}", status_code=status.HTTP_204_NO_CONTENT)
+    def delete_application(application_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+        app = db.query(models.Application).filter(models.Application.id == application_id).first()
+        if not app:
+            raise HTTPException(status_code=404, detail="Application not found")
+
+        if current_user.role != "ADMIN" and app.user_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Not authorized to delete this application")
+
+        crud.tombstone_applications(db, models.Application.id == application_id)
+        db.delete(app)
+        db.commit()
+        return
+
+    return router
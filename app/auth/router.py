@@ -1,30 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException,status
+"""
+Auth and user management routes, shared by the v1 and v2 APIs.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from .. import crud, schemas
-from ..deps import get_db
+from typing import Optional
+from .. import crud, schemas, models
+from ..config import (
+    RATE_LIMIT_REGISTER_EMAIL,
+    RATE_LIMIT_REGISTER_IP,
+    RATE_LIMIT_TOKEN_EMAIL,
+    RATE_LIMIT_TOKEN_IP,
+)
+from ..deps import get_db, get_read_db
+from ..ratelimit import RateLimit
+from ..serialization import list_response, parse_fields
 from .security import verify_password, create_access_token, get_current_user,get_current_admin
 
 router = APIRouter()
 
+# bcrypt makes both of these expensive; the limit is checked before the hash
+register_limit = RateLimit("register", per_ip=RATE_LIMIT_REGISTER_IP, per_email=RATE_LIMIT_REGISTER_EMAIL)
+token_limit = RateLimit("token", per_ip=RATE_LIMIT_TOKEN_IP, per_email=RATE_LIMIT_TOKEN_EMAIL)
+
 
 # -------- Register --------
-@router.post("/register", response_model=schemas.UserOut)
+@router.post("/register", response_model=schemas.UserOut, dependencies=[Depends(register_limit)])
 def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
     if crud.get_user_by_email(db, user.email):
         raise HTTPException(status_code=400, detail="Email already registered")
-    return crud.create_user(db, user)
+
+    # Create user and refresh to get all fields
+    db_user = crud.create_user(db, user)
+    db.refresh(db_user)
+    return db_user
 
 
 # -------- Login --------
-@router.post("/token")
+@router.post("/token", dependencies=[Depends(token_limit)])
 def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     user = crud.get_user_by_email(db, form_data.username)
     if not user or not verify_password(form_data.password, user.password_hash):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     token = create_access_token(user.id) 
-    return {"access_token": token, "token_type": "bearer"}
+    return {"access_token": token, "token_type": "bearer","user_id":user.id,"user_role":user.role}
 
 
 # -------- Current User --------
@@ -36,19 +57,27 @@ def get_me(current_user=Depends(get_current_user)):
 
 # ---- List all users ----
 @router.get("/users", response_model=list[schemas.UserOut])
-def list_users(db: Session = Depends(get_db), admin=Depends(get_current_admin)):
-    return db.query(User).all()
+def list_users(
+    fields: Optional[str] = None,
+    count: Optional[str] = Query(None, pattern="^(exact|estimated|cached)$"),
+    db: Session = Depends(get_read_db),
+    admin=Depends(get_current_admin),
+):
+    fields = parse_fields(schemas.UserOut, fields)
+    users = crud.with_fields(db.query(models.User), models.User, fields).all()
+    headers = {"X-Total-Count": str(crud.count_rows(db, models.User, count))} if count else None
+    return list_response(schemas.UserOut, users, fields, headers=headers)
 
 
 # ---- Update user ----
 @router.put("/users/{user_id}", response_model=schemas.UserOut)
-def update_user(user_id: int, user_update: schemas.UserUpdate, 
+def update_user(user_id: int, user_update: schemas.UserUpdate,
                 db: Session = Depends(get_db), admin=Depends(get_current_admin)):
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.query(models.User).filter(models.User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    for key, value in user_update.dict(exclude_unset=True).items():
+    for key, value in user_update.model_dump(exclude_unset=True).items():
         setattr(user, key, value)
 
     db.commit()
@@ -58,11 +87,18 @@ def update_user(user_id: int, user_update: schemas.UserUpdate,
 
 # ---- Delete user ----
 @router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user(user_id: int, db: Session = Depends(get_db), admin=Depends(get_current_admin)):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
+def delete_user_endpoint(user_id: int, db: Session = Depends(get_db), admin=Depends(get_current_admin)):
+    """
+    Delete a user and ALL their related data.
+    This will cascade delete:
+    - All applications by this user
+    - All next of kin records for those applications
+    - All spouse records for those applications
+    - All beneficiary records for those applications
+    - All document records for those applications
+    - All payment records for those applications
+    """
+    success = crud.delete_user(db, user_id)
+    if not success:
         raise HTTPException(status_code=404, detail="User not found")
-
-    db.delete(user)
-    db.commit()
     return
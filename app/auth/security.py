@@ -1,34 +1,46 @@
 """
 Security utilities for authentication.
+
+passlib/bcrypt and python-jose are imported on first use rather than at
+module import, which keeps them off the cold-start path.
 """
 
-from passlib.context import CryptContext
 from datetime import datetime, timedelta
-from jose import jwt, JWTError
+from functools import lru_cache
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from ..config import JWT_SECRET, JWT_ALGORITHM, JWT_EXPIRES_MIN
+from ..db import SessionLocal
 from ..deps import get_db
 from ..models import User
 
-pwd_ctx = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # OAuth2 scheme (points to /auth/token endpoint)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token", auto_error=False)
 
 
 # ---------------- Password utils ----------------
+@lru_cache(maxsize=1)
+def pwd_ctx():
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
 def hash_password(password: str) -> str:
-    return pwd_ctx.hash(password)
+    return pwd_ctx().hash(password)
 
 
 def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_ctx.verify(plain, hashed)
+    return pwd_ctx().verify(plain, hashed)
 
 
 # ---------------- JWT utils ----------------
 def create_access_token(user_id: int):
+    from jose import jwt
+
     expire = datetime.utcnow() + timedelta(minutes=JWT_EXPIRES_MIN)
     to_encode = {"sub": str(user_id), "exp": expire}
     return jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
@@ -38,12 +50,35 @@ def create_access_token(user_id: int):
 def get_current_user(
     token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
 ):
+    return user_from_token(token, db)
+
+
+def get_stream_user(
+    token: Optional[str] = Depends(optional_oauth2_scheme), access_token: Optional[str] = None
+):
+    """
+    Like get_current_user, for long-lived streams. Also accepts the token
+    as ?access_token= since browsers' EventSource cannot set headers, and
+    uses its own short session so the stream does not hold a connection.
+    """
+    db = SessionLocal()
+    try:
+        return user_from_token(token or access_token, db)
+    finally:
+        db.close()
+
+
+def user_from_token(token: Optional[str], db: Session) -> User:
+    from jose import jwt, JWTError
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+    if not token:
+        raise credentials_exception
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
         sub = payload.get("sub")
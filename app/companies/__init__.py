@@ -0,0 +1,7 @@
+"""
+Package initialization file for companies module.
+"""
+
+from .router import router as companies_router
+
+__all__ = ["companies_router"]
\ No newline at end of file
@@ -0,0 +1,154 @@
+"""
+Company management routes.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from .. import crud, schemas, models
+from ..deps import get_db, get_read_db
+from ..serialization import list_response, parse_fields
+from ..auth.security import get_current_user, get_current_admin
+
+router = APIRouter(prefix="/companies", tags=["companies"])
+
+# ------------------- Admin Endpoints -------------------
+@router.post("/", response_model=schemas.CompanyOut)
+def create_company(
+    company_data: schemas.CompanyCreate,
+    db: Session = Depends(get_db),
+    current_admin=Depends(get_current_admin),
+):
+    """
+    Create a new company (Admin only).
+    """
+    # Check if company with this name already exists
+    if crud.get_company_by_name(db, company_data.name):
+        raise HTTPException(status_code=400, detail="Company with this name already exists")
+
+    return crud.create_company(db, company_data)
+
+
+@router.get("/public", response_model=List[schemas.CompanyOut])
+def list_companies_public(
+    skip: int = 0,
+    limit: int = 100,
+    active_only: bool = True,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+):
+    """
+    List all companies. Public endpoint for registration.
+    """
+    fields = parse_fields(schemas.CompanyOut, fields)
+    companies = crud.get_companies(db, skip=skip, limit=limit, active_only=active_only, fields=fields)
+    return list_response(schemas.CompanyOut, companies, fields)
+
+
+@router.get("/", response_model=List[schemas.CompanyOut])
+def list_companies(
+    skip: int = 0,
+    limit: int = 100,
+    active_only: bool = True,
+    fields: Optional[str] = None,
+    count: Optional[str] = Query(None, pattern="^(exact|estimated|cached)$"),
+    db: Session = Depends(get_read_db),
+    current_user=Depends(get_current_user),
+):
+    """
+    List all companies. Any authenticated user can view companies;
+    `count` (X-Total-Count) is for admins only.
+    """
+    if count and current_user.role != "ADMIN":
+        raise HTTPException(status_code=403, detail="Only admins can request a total count")
+    fields = parse_fields(schemas.CompanyOut, fields)
+    companies = crud.get_companies(db, skip=skip, limit=limit, active_only=active_only, fields=fields)
+    criteria = [models.Company.is_active == 1] if active_only else []
+    headers = {"X-Total-Count": str(crud.count_rows(db, models.Company, count, criteria))} if count else None
+    return list_response(schemas.CompanyOut, companies, fields, headers=headers)
+
+
+@router.get("/stats", response_model=List[schemas.CompanyStats])
+def all_company_stats(
+    db: Session = Depends(get_read_db),
+    current_admin=Depends(get_current_admin),
+):
+    """
+    Applicants, applications by status, document completeness and payment
+    totals for every company (Admin only). Cached for a few minutes.
+    """
+    return crud.company_stats(db)
+
+
+@router.get("/{company_id}/stats", response_model=schemas.CompanyStats)
+def company_stats(
+    company_id: int,
+    db: Session = Depends(get_read_db),
+    current_admin=Depends(get_current_admin),
+):
+    """Statistics for one company (Admin only). Cached for a few minutes."""
+    stats = crud.company_stats(db, company_id)
+    if not stats:
+        raise HTTPException(status_code=404, detail="Company not found")
+    return stats[0]
+
+
+@router.get("/{company_id}", response_model=schemas.CompanyOut)
+def get_company(
+    company_id: int,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """
+    Get company by ID.
+    """
+    company = crud.get_company_by_id(db, company_id)
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    return company
+
+
+@router.put("/{company_id}", response_model=schemas.CompanyOut)
+def update_company(
+    company_id: int,
+    company_update: schemas.CompanyUpdate,
+    db: Session = Depends(get_db),
+    current_admin=Depends(get_current_admin),
+):
+    """
+    Update company (Admin only).
+    """
+    company = crud.update_company(db, company_id, company_update)
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    return company
+
+
+@router.delete("/{company_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_company(
+    company_id: int,
+    db: Session = Depends(get_db),
+    current_admin=Depends(get_current_admin),
+):
+    """
+    Delete company (Admin only).
+    """
+    success = crud.delete_company(db, company_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Company not found")
+    return
+
+
+@router.delete("/{company_id}/users", response_model=schemas.PurgeResult)
+def purge_company_users(
+    company_id: int,
+    db: Session = Depends(get_db),
+    current_admin=Depends(get_current_admin),
+):
+    """
+    Delete all users of a company and all their data, in batches (Admin only).
+    Admin accounts are never deleted.
+    """
+    if not crud.get_company_by_id(db, company_id):
+        raise HTTPException(status_code=404, detail="Company not found")
+    return {"deleted": crud.purge_company_users(db, company_id, actor_user_id=current_admin.id)}
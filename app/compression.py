@@ -0,0 +1,147 @@
+"""
+Response compression.
+
+Negotiated from Accept-Encoding: brotli when the optional `brotli` package
+is installed and the client accepts it, otherwise gzip. Bodies smaller
+than COMPRESSION_MIN_SIZE, already encoded bodies, partial content and
+types that do not shrink (images, PDFs, archives) are sent as is.
+
+Streaming responses are compressed chunk by chunk and flushed after each
+one, so exports are never buffered and Server-Sent Events still arrive
+as they are sent (text/event-stream is left alone all the same, since
+some proxies hold back compressed event streams).
+"""
+
+import zlib
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+from .config import COMPRESSION_BROTLI_QUALITY, COMPRESSION_ENABLED, COMPRESSION_GZIP_LEVEL, COMPRESSION_MIN_SIZE
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/xml", "application/javascript", "application/problem+json")
+SKIPPED_TYPES = ("text/event-stream",)
+# single bodies above this are compressed in the threadpool instead of on the event loop
+THREADPOOL_THRESHOLD = 256 * 1024
+
+
+def choose_encoding(accept_encoding: str):
+    """Best supported coding in an Accept-Encoding header, or None for identity."""
+    offered = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        offered[coding.strip().lower()] = q
+    supported = ("br", "gzip") if brotli is not None else ("gzip",)
+    candidates = [(offered.get(c, offered.get("*", 0.0)), -n, c) for n, c in enumerate(supported)]
+    q, _, coding = max(candidates)
+    return coding if q > 0 else None
+
+
+class _Gzip:
+    def __init__(self, level: int):
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+
+    def compress(self, data: bytes, finish: bool) -> bytes:
+        out = self._z.compress(data)
+        return out + self._z.flush(zlib.Z_FINISH if finish else zlib.Z_SYNC_FLUSH)
+
+
+class _Brotli:
+    def __init__(self, quality: int):
+        self._c = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, finish: bool) -> bytes:
+        out = self._c.process(data)
+        return out + (self._c.finish() if finish else self._c.flush())
+
+
+def _compressor(encoding: str):
+    return _Brotli(COMPRESSION_BROTLI_QUALITY) if encoding == "br" else _Gzip(COMPRESSION_GZIP_LEVEL)
+
+
+def _compressible(status: int, headers: Headers) -> bool:
+    content_type = headers.get("content-type", "").lower()
+    return (
+        status not in (204, 206, 304)
+        and "content-encoding" not in headers
+        and "content-range" not in headers
+        and content_type.startswith(COMPRESSIBLE_TYPES)
+        and not content_type.startswith(SKIPPED_TYPES)
+    )
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware, so streaming responses are not buffered."""
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        state = {"start": None, "compressor": None, "passthrough": False}
+
+        async def compressing_send(message):
+            if message["type"] == "http.response.start":
+                if not _compressible(message["status"], Headers(raw=message["headers"])):
+                    state["passthrough"] = True
+                    await send(message)
+                else:
+                    state["start"] = message  # held until the first body tells us the size
+                return
+            if message["type"] != "http.response.body" or state["passthrough"]:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            start, state["start"] = state["start"], None
+            if start is not None:
+                headers = MutableHeaders(raw=start["headers"])
+                headers.add_vary_header("Accept-Encoding")
+                if encoding is None or (not more_body and len(body) < self.minimum_size):
+                    state["passthrough"] = True
+                    await send(start)
+                    await send(message)
+                    return
+                headers["Content-Encoding"] = encoding
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = "W/" + etag  # no longer byte-identical to the identity form
+                state["compressor"] = _compressor(encoding)
+                if more_body:
+                    del headers["Content-Length"]
+                    await send(start)
+                else:
+                    compress = state["compressor"].compress
+                    if len(body) > THREADPOOL_THRESHOLD:
+                        body = await run_in_threadpool(compress, body, True)
+                    else:
+                        body = compress(body, True)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+
+            await send({
+                "type": "http.response.body",
+                "body": state["compressor"].compress(body, not more_body),
+                "more_body": more_body,
+            })
+
+        await self.app(scope, receive, compressing_send)
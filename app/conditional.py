@@ -0,0 +1,88 @@
+"""
+Conditional GET helpers.
+
+Endpoints look up a resource's validators (its version or updated_at, for
+lists the row count and newest updated_at) with a cheap query, and answer
+If-None-Match / If-Modified-Since with a bare 304 before loading or
+serializing anything.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag over the given parts, e.g. an id and a version."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    # SQLite hands back naive timestamps; they are UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None) -> dict:
+    # private, no-cache: browsers may keep the response but must revalidate
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_utc(last_modified), usegmt=True)
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """
+    True when the client's copy is current. If-None-Match takes precedence
+    over If-Modified-Since, as in RFC 9110.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have whole seconds
+        return _utc(last_modified).replace(microsecond=0) <= _utc(since)
+    return False
+
+
+def not_modified(headers: dict) -> Response:
+    return Response(status_code=304, headers=headers)
+
+
+def parse_range(header: Optional[str], size: int):
+    """
+    The (start, end) byte range, inclusive, asked for by a Range header,
+    or None to send the whole body (no header, a unit other than bytes,
+    or several ranges, which we do not serve as multipart). Raises
+    ValueError when the range cannot be satisfied (416).
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, sep, last = header[6:].strip().partition("-")
+    if not sep or not (first or last):
+        return None
+    try:
+        start = int(first) if first else None
+        end = int(last) if last else None
+    except ValueError:
+        return None  # malformed: ignored, as RFC 9110 allows
+    if start is None:  # suffix: the last `end` bytes
+        if end <= 0 or size == 0:
+            raise ValueError("unsatisfiable range")
+        return max(size - end, 0), size - 1
+    if end is not None and start > end:
+        return None
+    if start >= size:
+        raise ValueError("unsatisfiable range")
+    return start, size - 1 if end is None else min(end, size - 1)
@@ -13,3 +13,56 @@ JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 JWT_EXPIRES_MIN = int(os.getenv("JWT_EXPIRES_MIN", "60"))
 CORS_ORIGINS = os.getenv("CORS_ORIGINS", "http://localhost:5173,http://localhost:5174").split(",")
 UPLOAD_DIR = os.getenv("UPLOAD_DIR", "./uploads")
+COUNT_CACHE_TTL = int(os.getenv("COUNT_CACHE_TTL", "60"))  # seconds
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR")  # shared dir for multi-worker aggregation
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))  # seconds
+SQL_INSTRUMENTATION = os.getenv("SQL_INSTRUMENTATION", "0") == "1"  # can be toggled at runtime by admins
+SQL_SLOW_MS = float(os.getenv("SQL_SLOW_MS", "200"))
+SQL_REPEAT_THRESHOLD = int(os.getenv("SQL_REPEAT_THRESHOLD", "10"))  # same statement more often than this looks like N+1
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "1") == "1"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))  # fraction of all requests, e.g. 0.001
+PROFILE_MAX_PER_MINUTE = int(os.getenv("PROFILE_MAX_PER_MINUTE", "6"))  # per worker
+PROFILE_BUFFER_SIZE = int(os.getenv("PROFILE_BUFFER_SIZE", "50"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))  # per worker, least recently used evicted
+# "<requests>/<second|minute|hour>", empty to disable that bucket
+RATE_LIMIT_TOKEN_IP = os.getenv("RATE_LIMIT_TOKEN_IP", "30/minute")
+RATE_LIMIT_TOKEN_EMAIL = os.getenv("RATE_LIMIT_TOKEN_EMAIL", "10/minute")
+RATE_LIMIT_REGISTER_IP = os.getenv("RATE_LIMIT_REGISTER_IP", "10/minute")
+RATE_LIMIT_REGISTER_EMAIL = os.getenv("RATE_LIMIT_REGISTER_EMAIL", "5/hour")
+DATABASE_REPLICA_URLS = [url for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))  # lagging replicas are skipped
+REPLICA_HEALTH_INTERVAL = float(os.getenv("REPLICA_HEALTH_INTERVAL", "10"))  # seconds between checks
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))  # reads stay on primary after a write
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", str(24 * 3600)))  # how long a key can be replayed
+IDEMPOTENCY_LOCK_TIMEOUT = int(os.getenv("IDEMPOTENCY_LOCK_TIMEOUT", "60"))  # an in-flight request older than this is presumed dead
+IDEMPOTENCY_PURGE_INTERVAL = int(os.getenv("IDEMPOTENCY_PURGE_INTERVAL", "3600"))  # seconds between expired-key cleanups
+PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", "500"))  # rows per transaction in bulk deletes
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", "2"))  # jobs run at once per `python -m app.worker`
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1"))  # seconds an idle worker waits between claims
+JOB_LOCK_TIMEOUT = int(os.getenv("JOB_LOCK_TIMEOUT", "300"))  # a running job whose lease is not renewed for this long is reclaimed
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", str(JOB_LOCK_TIMEOUT / 3)))  # seconds between lease renewals
+JOB_RETRY_BASE_SECONDS = int(os.getenv("JOB_RETRY_BASE_SECONDS", "10"))  # backoff: base * 2 ** (attempt - 1)
+JOB_ARTIFACT_DIR = os.getenv("JOB_ARTIFACT_DIR", "./job_artifacts")
+COMPANY_STATS_TTL = int(os.getenv("COMPANY_STATS_TTL", "300"))  # seconds
+EVENTS_PG_NOTIFY = os.getenv("EVENTS_PG_NOTIFY", "0") == "1"  # fan status events out across workers via LISTEN/NOTIFY
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "100"))  # buffered events per open stream
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+SYNC_SETTLE_SECONDS = float(os.getenv("SYNC_SETTLE_SECONDS", "2"))  # changes younger than this wait for the next sync, so slow commits are not skipped
+SYNC_TOMBSTONE_DAYS = int(os.getenv("SYNC_TOMBSTONE_DAYS", "30"))  # deletions are kept this long; older cursors must resync
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "1") == "1"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # bytes; smaller bodies are sent as is
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "5"))  # 1 (fastest) .. 9 (smallest)
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))  # 0 .. 11, used when brotli is installed
+# per-process pool; python -m app.serve derives these from DB_CONNECTION_BUDGET when they are unset
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds before a connection is replaced
+DB_CONNECTION_BUDGET = int(os.getenv("DB_CONNECTION_BUDGET", "0"))  # connections all web workers of a host may hold, 0 for no limit
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", "0"))  # 0: one per available CPU core
+GRACEFUL_TIMEOUT = float(os.getenv("GRACEFUL_TIMEOUT", "30"))  # seconds in-flight requests get to finish on SIGTERM
+DOCUMENT_STORAGE = os.getenv("DOCUMENT_STORAGE", "blob")  # "blob" (Vercel Blob) or "local" (UPLOAD_DIR, served only through the API)
+DOCUMENT_CHUNK_SIZE = int(os.getenv("DOCUMENT_CHUNK_SIZE", str(64 * 1024)))  # bytes per read when streaming documents
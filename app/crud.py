@@ -1,26 +1,83 @@
-from sqlalchemy.orm import Session
-from passlib.context import CryptContext
-from . import models ,schemas
-import httpx
+from sqlalchemy import and_, case, delete, func, insert, literal, or_, select, text, tuple_, update
+from sqlalchemy.orm import Session, joinedload, load_only, selectinload, undefer
+from sqlalchemy.exc import IntegrityError
+from . import events, models ,schemas, storage
+from .auth.security import hash_password
 import shutil
 import os
 from fastapi import UploadFile
-from .config import UPLOAD_DIR
+from .config import (
+    UPLOAD_DIR, COUNT_CACHE_TTL, COMPANY_STATS_TTL, PURGE_BATCH_SIZE, SYNC_SETTLE_SECONDS, SYNC_TOMBSTONE_DAYS,
+)
+import base64
 import json
-from typing import Optional
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Sequence
 
 # if not os.path.exists(UPLOAD_DIR):
 #     os.makedirs(UPLOAD_DIR)
 
-pwd_context=  CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-BLOB_TOKEN = os.getenv("BLOB_READ_WRITE_TOKEN")
-BLOB_API_URL = "https://blob.vercel-storage.com/upload"
+def with_fields(query, model, fields: Optional[Sequence[str]] = None):
+    """Restrict the columns loaded by `query` to `fields` (primary key is always loaded)."""
+    if fields:
+        query = query.options(load_only(*[getattr(model, f) for f in fields]))
+    return query
+
+
+# ------------------ COUNTS ------------------
+_count_cache: dict = {}
+
+
+def _estimate_count(db: Session, stmt, table_name: str, filtered: bool):
+    """Planner row estimate; None when unavailable (non-Postgres or never analyzed)."""
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+    if not filtered:
+        estimate = db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE relname = :name"),
+            {"name": table_name},
+        ).scalar()
+    else:
+        sql = str(stmt.compile(db.get_bind(), compile_kwargs={"literal_binds": True}))
+        plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = plan[0]["Plan"]["Plan Rows"]
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
+
+
+def count_rows(db: Session, model, mode: str = "exact", criteria: Sequence = ()):
+    """
+    Count rows of `model` matching `criteria`.
+    exact: COUNT(*); estimated: planner estimate, falling back to exact;
+    cached: exact, reused for COUNT_CACHE_TTL seconds.
+    """
+    stmt = select(func.count()).select_from(model).where(*criteria)
+    if mode == "estimated":
+        estimate = _estimate_count(db, select(model.id).where(*criteria), model.__tablename__, bool(criteria))
+        if estimate is not None:
+            return estimate
+    if mode == "cached":
+        key = str(stmt.compile(db.get_bind(), compile_kwargs={"literal_binds": True}))
+        hit = _count_cache.get(key)
+        now = time.monotonic()
+        if hit and hit[0] > now:
+            return hit[1]
+        total = db.execute(stmt).scalar()
+        if len(_count_cache) >= 1024:
+            _count_cache.clear()
+        _count_cache[key] = (now + COUNT_CACHE_TTL, total)
+        return total
+    return db.execute(stmt).scalar()
 
 
 # ------------------ COMPANIES ------------------
 def create_company(db: Session, company: schemas.CompanyCreate):
-    db_company = models.Company(**company.dict())
+    db_company = models.Company(**company.model_dump())
     db.add(db_company)
     db.commit()
     db.refresh(db_company)
@@ -32,8 +89,8 @@ def get_company_by_id(db: Session, company_id: int):
 def get_company_by_name(db: Session, name: str):
     return db.query(models.Company).filter(models.Company.name == name).first()
 
-def get_companies(db: Session, skip: int = 0, limit: int = 100, active_only: bool = True):
-    query = db.query(models.Company)
+def get_companies(db: Session, skip: int = 0, limit: int = 100, active_only: bool = True, fields: Optional[Sequence[str]] = None):
+    query = with_fields(db.query(models.Company), models.Company, fields)
     if active_only:
         query = query.filter(models.Company.is_active == 1)
     return query.offset(skip).limit(limit).all()
@@ -41,12 +98,95 @@ def get_companies(db: Session, skip: int = 0, limit: int = 100, active_only: boo
 def update_company(db: Session, company_id: int, company_update: schemas.CompanyUpdate):
     company = db.query(models.Company).filter(models.Company.id == company_id).first()
     if company:
-        for key, value in company_update.dict(exclude_unset=True).items():
+        for key, value in company_update.model_dump(exclude_unset=True).items():
             setattr(company, key, value)
         db.commit()
         db.refresh(company)
     return company
 
+# kinds an application needs before it counts as having complete documents
+REQUIRED_DOCUMENT_KINDS = ("ID_SCAN", "PROOF_OF_RESIDENCE", "PAYSLIP", "SIGNATURE")
+APPLICATION_STATUSES = ("PENDING", "APPROVED", "REJECTED")
+# decisions are made from PENDING; a decided application can only be reopened
+ALLOWED_STATUS_TRANSITIONS = {
+    "PENDING": {"APPROVED", "REJECTED"},
+    "APPROVED": {"PENDING"},
+    "REJECTED": {"PENDING"},
+}
+_company_stats_cache: dict = {}
+
+
+def company_stats(db: Session, company_id: Optional[int] = None) -> list:
+    """
+    Applicant, application, document and payment figures per company, in
+    one grouped query. Documents and payments are pre-aggregated per
+    application so the joins do not multiply rows. Results are reused for
+    COMPANY_STATS_TTL seconds.
+    """
+    hit = _company_stats_cache.get(company_id)
+    now = time.monotonic()
+    if hit and hit[0] > now:
+        return hit[1]
+
+    C, U, A = models.Company, models.User, models.Application
+    docs = (
+        select(models.Document.application_id, func.count(func.distinct(models.Document.kind)).label("kinds"))
+        .where(models.Document.kind.in_(REQUIRED_DOCUMENT_KINDS))
+        .group_by(models.Document.application_id)
+        .subquery()
+    )
+    pays = (
+        select(
+            models.Payment.application_id,
+            func.count(models.Payment.id).label("n"),
+            func.sum(models.Payment.amount).label("total"),
+        )
+        .group_by(models.Payment.application_id)
+        .subquery()
+    )
+    complete = func.coalesce(docs.c.kinds, 0) == len(REQUIRED_DOCUMENT_KINDS)
+    stmt = (
+        select(
+            C.id,
+            C.name,
+            func.count(func.distinct(U.id)).label("applicants"),
+            func.count(A.id).label("applications"),
+            *(func.count(case((A.status == s, A.id))).label(s) for s in APPLICATION_STATUSES),
+            func.count(case((complete, A.id))).label("complete_documents"),
+            func.coalesce(func.sum(pays.c.n), 0).label("payments_count"),
+            func.coalesce(func.sum(pays.c.total), 0).label("payments_total"),
+        )
+        .select_from(C)
+        .outerjoin(U, U.company_id == C.id)
+        .outerjoin(A, A.user_id == U.id)
+        .outerjoin(docs, docs.c.application_id == A.id)
+        .outerjoin(pays, pays.c.application_id == A.id)
+        .group_by(C.id, C.name)
+        .order_by(C.name)
+    )
+    if company_id is not None:
+        stmt = stmt.where(C.id == company_id)
+
+    stats = [
+        {
+            "company_id": row.id,
+            "company_name": row.name,
+            "applicants": row.applicants,
+            "applications": row.applications,
+            "applications_by_status": {s: row._mapping[s] for s in APPLICATION_STATUSES},
+            "complete_documents": row.complete_documents,
+            "document_completeness": round(row.complete_documents / row.applications, 4) if row.applications else None,
+            "payments_count": row.payments_count,
+            "payments_total": float(row.payments_total),
+        }
+        for row in db.execute(stmt)
+    ]
+    if len(_company_stats_cache) >= 1024:
+        _company_stats_cache.clear()
+    _company_stats_cache[company_id] = (now + COMPANY_STATS_TTL, stats)
+    return stats
+
+
 def delete_company(db: Session, company_id: int):
     company = db.query(models.Company).filter(models.Company.id == company_id).first()
     if company:
@@ -64,7 +204,12 @@ def log_action(
     action: str,
     target_id: Optional[int] = None,
     meta: Optional[dict] = None,
+    commit: bool = True,
 ):
+    """
+    Record an audit entry. Pass commit=False to add it to the caller's
+    transaction instead of committing on its own.
+    """
     entry = models.AuditLog(
         actor_user_id=actor_user_id,
         action=action,
@@ -72,8 +217,9 @@ def log_action(
         meta=json.dumps(meta or {}),
     )
     db.add(entry)
-    db.commit()
-    db.refresh(entry)
+    if commit:
+        db.commit()
+        db.refresh(entry)
     return entry
 
 def list_audit_logs(db: Session, skip: int = 0, limit: int = 100):
@@ -88,6 +234,133 @@ def list_audit_logs_for_application(db: Session, application_id: int):
     )
 
 
+# ------------------ DELTA SYNC ------------------
+class SyncCursorExpired(Exception):
+    """The cursor is older than the tombstone retention; the client must resync."""
+
+
+def touch_applications(db: Session, application_ids) -> None:
+    """Mark applications changed after a Core write to their child rows. Does not commit."""
+    if application_ids:
+        db.execute(
+            update(models.Application)
+            .where(models.Application.id.in_(list(application_ids)))
+            .values(updated_at=models.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+
+
+def tombstone_applications(db: Session, *criteria) -> None:
+    """Record the applications matching `criteria` as deleted, before deleting them. Does not commit."""
+    # the app clock, like updated_at, so sync cursors compare both on one clock
+    deleted_at = literal(models.utcnow(), type_=models.DeletedRecord.deleted_at.type)
+    db.execute(
+        insert(models.DeletedRecord).from_select(
+            ["record_type", "record_id", "deleted_at"],
+            select(literal("application"), models.Application.id, deleted_at).where(*criteria),
+        )
+    )
+
+
+def encode_sync_cursor(updated_at: Optional[datetime], last_id: int, tombstone_id: int, synced_at: datetime) -> str:
+    raw = json.dumps([updated_at.isoformat() if updated_at else None, last_id, tombstone_id, synced_at.timestamp()])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_sync_cursor(cursor: str):
+    """Inverse of encode_sync_cursor; raises ValueError for anything malformed."""
+    try:
+        updated_at, last_id, tombstone_id, synced_at = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return (
+            datetime.fromisoformat(updated_at) if updated_at else None,
+            int(last_id),
+            int(tombstone_id),
+            datetime.fromtimestamp(synced_at, timezone.utc),
+        )
+    except (TypeError, ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def application_changes(db: Session, cursor: Optional[str] = None, limit: int = 500, with_children: bool = False):
+    """
+    Applications changed since `cursor`, oldest change first, plus the ids
+    of applications deleted since then. Without a cursor every application
+    is returned (and no deletions). Returns (applications, deleted_ids,
+    next_cursor, has_more).
+
+    Changes are walked by (updated_at, id) on ix_applications_updated_at_id.
+    Rows changed in the last SYNC_SETTLE_SECONDS are left for the next call:
+    a transaction that commits late can carry an updated_at older than
+    rows already handed out.
+    """
+    A, T = models.Application, models.DeletedRecord
+    now = datetime.now(timezone.utc)
+    settled = now - timedelta(seconds=SYNC_SETTLE_SECONDS)
+    if cursor is None:
+        after_ts, after_id = None, 0
+        tombstone_id = db.scalar(select(func.max(T.id)).where(T.deleted_at < settled)) or 0
+    else:
+        after_ts, after_id, tombstone_id, synced_at = decode_sync_cursor(cursor)
+        if synced_at < now - timedelta(days=SYNC_TOMBSTONE_DAYS):
+            raise SyncCursorExpired()
+
+    query = select(A).where(A.updated_at < settled).order_by(A.updated_at, A.id).limit(limit + 1)
+    if after_ts is not None:
+        query = query.where(tuple_(A.updated_at, A.id) > tuple_(after_ts, after_id))
+    if with_children:
+        query = query.options(
+            joinedload(A.next_of_kin),
+            joinedload(A.spouse),
+            selectinload(A.beneficiaries),
+            selectinload(A.documents),
+            selectinload(A.payments),
+        )
+    apps = db.scalars(query).unique().all()
+
+    tombstones = db.execute(
+        select(T.id, T.record_id)
+        .where(T.record_type == "application", T.id > tombstone_id, T.deleted_at < settled)
+        .order_by(T.id)
+        .limit(limit + 1)
+    ).all()
+
+    has_more = len(apps) > limit or len(tombstones) > limit
+    apps, tombstones = apps[:limit], tombstones[:limit]
+    if apps:
+        after_ts, after_id = apps[-1].updated_at, apps[-1].id
+    if tombstones:
+        tombstone_id = tombstones[-1].id
+    next_cursor = encode_sync_cursor(after_ts, after_id, tombstone_id, now)
+    return apps, [t.record_id for t in tombstones], next_cursor, has_more
+
+
+def purge_tombstones(db: Session) -> int:
+    """Drop deletion records older than SYNC_TOMBSTONE_DAYS; commits."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=SYNC_TOMBSTONE_DAYS)
+    deleted = db.execute(delete(models.DeletedRecord).where(models.DeletedRecord.deleted_at < cutoff)).rowcount
+    db.commit()
+    return deleted
+
+
+def list_status_events(db: Session, user_id: int, after_id: int, limit: int = 500):
+    """Status changes of a user's applications logged after `after_id`, as events."""
+    rows = db.execute(
+        select(models.AuditLog.id, models.AuditLog.target_id, models.AuditLog.meta)
+        .join(models.Application, models.Application.id == models.AuditLog.target_id)
+        .where(
+            models.AuditLog.action == "APPLICATION_STATUS_CHANGED",
+            models.Application.user_id == user_id,
+            models.AuditLog.id > after_id,
+        )
+        .order_by(models.AuditLog.id)
+        .limit(limit)
+    ).all()
+    return [
+        {"id": row.id, "user_id": user_id, "application_id": row.target_id, "status": json.loads(row.meta)["new_status"]}
+        for row in rows
+    ]
+
+
 #----------------USERS-----------
 def get_user_by_email(db: Session, email: str):
     return db.query(models.User).filter(models.User.email == email).first()
@@ -95,7 +368,7 @@ def get_user_by_email(db: Session, email: str):
 
 
 def create_user(db: Session, user: schemas.UserCreate):
-    hashed_password = pwd_context.hash(user.password)
+    hashed_password = hash_password(user.password)
     db_user = models.User(
         email=user.email,
         first_name=user.first_name,
@@ -124,18 +397,53 @@ def delete_user(db: Session, user_id: int):
     - All related document records
     - All related payment records
     - Sets audit log actor_user_id to NULL for this user
+    The related rows are removed by the database (ON DELETE CASCADE),
+    not loaded and deleted one by one.
     """
-    user = db.query(models.User).filter(models.User.id == user_id).first()
-    if user:
-        db.delete(user)
+    tombstone_applications(db, models.Application.user_id == user_id)
+    deleted = db.query(models.User).filter(models.User.id == user_id).delete(synchronize_session=False)
+    db.commit()
+    return deleted > 0
+
+
+def _delete_in_batches(db: Session, model, criteria: Sequence, batch_size: int, on_batch=None) -> int:
+    """
+    Delete matching rows `batch_size` at a time, committing after each
+    batch so locks are held briefly. Child rows go through ON DELETE CASCADE.
+    `on_batch(ids)` runs in each batch's transaction before the delete.
+    """
+    total = 0
+    while True:
+        ids = db.execute(select(model.id).where(*criteria).limit(batch_size)).scalars().all()
+        if not ids:
+            return total
+        if on_batch is not None:
+            on_batch(ids)
+        deleted = db.execute(delete(model).where(model.id.in_(ids)), execution_options={"synchronize_session": False}).rowcount
         db.commit()
-        return True
-    return False
+        total += deleted
+        if len(ids) < batch_size:
+            return total
 
 
-def get_users(db: Session, skip: int = 0, limit: int = 100, company_id: int = None):
+def purge_company_users(db: Session, company_id: int, actor_user_id: int, batch_size: int = PURGE_BATCH_SIZE) -> int:
+    """Delete every non-admin user of a company, with all their data. Admin accounts are kept."""
+    criteria = [
+        models.User.company_id == company_id,
+        models.User.id != actor_user_id,
+        or_(models.User.role.is_(None), models.User.role != "ADMIN"),
+    ]
+    deleted = _delete_in_batches(
+        db, models.User, criteria, batch_size,
+        on_batch=lambda ids: tombstone_applications(db, models.Application.user_id.in_(ids)),
+    )
+    log_action(db, actor_user_id=actor_user_id, action="COMPANY_USERS_PURGED", target_id=company_id, meta={"deleted": deleted})
+    return deleted
+
+
+def get_users(db: Session, skip: int = 0, limit: int = 100, company_id: int = None, fields: Optional[Sequence[str]] = None):
     """Get all users with optional company filtering"""
-    query = db.query(models.User)
+    query = with_fields(db.query(models.User), models.User, fields)
     if company_id:
         query = query.filter(models.User.company_id == company_id)
     return query.offset(skip).limit(limit).all()
@@ -158,6 +466,8 @@ def create_application(db: Session, app_data: schemas.ApplicationCreate, user_id
         employer_contact=app_data.employer_contact,
     )
     db.add(db_app)
+    db.flush()
+    waiting_list_enter(db, db_app.id)
     db.commit()
     db.refresh(db_app)
     # log
@@ -171,8 +481,14 @@ def create_application(db: Session, app_data: schemas.ApplicationCreate, user_id
     return db_app
 
 
-def get_applications_by_user(db: Session, user_id: int):
-    apps = db.query(models.Application).filter(models.Application.user_id == user_id).all()
+def get_applications_by_user(
+    db: Session, user_id: int, fields: Optional[Sequence[str]] = None, with_position: bool = False
+):
+    query = with_fields(db.query(models.Application), models.Application, fields)
+    if with_position:
+        # correlated subquery in the same SELECT, no extra round trip
+        query = query.options(undefer(models.Application.queue_position))
+    apps = query.filter(models.Application.user_id == user_id).all()
     return apps
 
 
@@ -180,30 +496,282 @@ def get_application_by_id(db: Session, application_id: int):
     return db.query(models.Application).filter(models.Application.id == application_id).first()
 
 
-def list_all_applications(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Application).offset(skip).limit(limit).all()
+def application_validators(db: Session, application_id: int):
+    """(user_id, version, updated_at) of an application, without loading the row."""
+    A = models.Application
+    return db.execute(select(A.user_id, A.version, A.updated_at).where(A.id == application_id)).first()
+
+
+def applications_list_validators(db: Session, user_id: int):
+    """(count, newest updated_at) of a user's applications; index-only on (user_id, updated_at)."""
+    A = models.Application
+    return db.execute(select(func.count(), func.max(A.updated_at)).where(A.user_id == user_id)).one()
+
+
+def documents_list_validators(db: Session, application_id: int):
+    """(count, newest updated_at) of an application's documents."""
+    D = models.Document
+    return db.execute(select(func.count(), func.max(D.updated_at)).where(D.application_id == application_id)).one()
 
 
-def update_application_status(db: Session, application_id: int, status: str, actor_user_id: int = None):
-    app = db.query(models.Application).filter(models.Application.id == application_id).first()
-    if app:
-        app.status = status
+def get_application_full(db: Session, application_id: int):
+    """Load an application together with all of its child records."""
+    return (
+        db.query(models.Application)
+        .options(
+            joinedload(models.Application.next_of_kin),
+            joinedload(models.Application.spouse),
+            selectinload(models.Application.beneficiaries),
+            selectinload(models.Application.payments),
+        )
+        .filter(models.Application.id == application_id)
+        .first()
+    )
+
+
+def submit_full_application(db: Session, data: schemas.ApplicationSubmit, user_id: int):
+    """
+    Create an application together with next of kin, spouse, beneficiaries
+    and payments in a single transaction.
+    Children of the same kind are flushed as one batched INSERT and the
+    whole submission is recorded as one audit entry.
+    """
+    children = {"next_of_kin", "spouse", "beneficiaries", "payments"}
+    db_app = models.Application(user_id=user_id, **data.model_dump(exclude=children))
+    if data.next_of_kin:
+        db_app.next_of_kin = models.NextOfKin(**data.next_of_kin.model_dump())
+    if data.spouse:
+        db_app.spouse = models.Spouse(**data.spouse.model_dump())
+    db_app.beneficiaries = [models.Beneficiary(**b.model_dump()) for b in data.beneficiaries]
+    db_app.payments = [models.Payment(**p.model_dump()) for p in data.payments]
+    db.add(db_app)
+    try:
+        db.flush()
+        waiting_list_enter(db, db_app.id)
+        log_action(
+            db,
+            actor_user_id=user_id,
+            action="APPLICATION_SUBMITTED",
+            target_id=db_app.id,
+            meta={
+                "name": db_app.name,
+                "surname": db_app.surname,
+                "next_of_kin": data.next_of_kin is not None,
+                "spouse": data.spouse is not None,
+                "beneficiaries": len(data.beneficiaries),
+                "payments": len(data.payments),
+            },
+            commit=False,
+        )
         db.commit()
-        db.refresh(app)
-        if actor_user_id is not None:
-            log_action(
-                db,
-                actor_user_id=actor_user_id,
-                action="APPLICATION_STATUS_CHANGED",
-                target_id=application_id,
-                meta={"new_status": status},
-            )
-    return app
+    except IntegrityError:
+        db.rollback()
+        raise
+    return get_application_full(db, db_app.id)
+
+
+def list_all_applications(db: Session, skip: int = 0, limit: int = 100, fields: Optional[Sequence[str]] = None):
+    query = with_fields(db.query(models.Application), models.Application, fields)
+    return query.offset(skip).limit(limit).all()
+
+
+class InvalidStatusTransition(ValueError):
+    pass
+
+
+class StaleApplication(Exception):
+    """The application changed since the version the caller saw."""
+
+
+def allowed_sources(status: str):
+    return [source for source, targets in ALLOWED_STATUS_TRANSITIONS.items() if status in targets]
+
+
+def update_application_status(
+    db: Session,
+    application_id: int,
+    status: str,
+    actor_user_id: int = None,
+    expected_version: Optional[int] = None,
+):
+    """
+    Move an application to `status` with a single conditional
+    UPDATE ... WHERE id = ? AND version = ?, so concurrent reviewers cannot
+    overwrite each other and no lock is held between reading and writing.
+    `expected_version` is the version the caller based its decision on;
+    without it, the version read here is used.
+    Raises InvalidStatusTransition or StaleApplication; returns None if not found.
+    """
+    A = models.Application
+    current = db.execute(select(A.status, A.version, A.user_id).where(A.id == application_id)).first()
+    if current is None:
+        return None
+    version = expected_version if expected_version is not None else current.version
+    if version != current.version:
+        raise StaleApplication()
+    if status not in ALLOWED_STATUS_TRANSITIONS.get(current.status, ()):
+        raise InvalidStatusTransition(f"Cannot change status from {current.status} to {status}")
+
+    changed = db.execute(
+        update(A)
+        .where(A.id == application_id, A.version == version)
+        .values(status=status, version=A.version + 1)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not changed:
+        db.rollback()
+        raise StaleApplication()
+    if status == "PENDING":
+        waiting_list_enter(db, application_id)
+    else:
+        waiting_list_leave(db, application_id)
+    entry = log_action(
+        db,
+        actor_user_id=actor_user_id,
+        action="APPLICATION_STATUS_CHANGED",
+        target_id=application_id,
+        meta={"old_status": current.status, "new_status": status},
+        commit=False,
+    )
+    db.flush()
+    # the audit entry id doubles as the event id for SSE resumption
+    events.publish(db, [{"id": entry.id, "user_id": current.user_id, "application_id": application_id, "status": status}])
+    db.commit()
+    return db.query(A).populate_existing().filter(A.id == application_id).first()
+
+
+def bulk_update_application_status(
+    db: Session,
+    status: str,
+    actor_user_id: int,
+    ids: Optional[list] = None,
+    filters: Optional[schemas.BulkStatusFilter] = None,
+):
+    """
+    Move every matching application to `status` with one UPDATE ... RETURNING
+    and record the audit rows with one multi-row INSERT. Applications whose
+    current status cannot move to `status` are skipped.
+    Returns the IDs that actually changed.
+    """
+    stmt = (
+        update(models.Application)
+        .where(models.Application.status.in_(allowed_sources(status)))
+        .values(status=status, version=models.Application.version + 1)
+        .returning(models.Application.id, models.Application.user_id)
+        .execution_options(synchronize_session=False)
+    )
+    if ids is not None:
+        stmt = stmt.where(models.Application.id.in_(ids))
+    if filters is not None:
+        if filters.status:
+            stmt = stmt.where(models.Application.status == filters.status)
+        if filters.created_after:
+            stmt = stmt.where(models.Application.created_at >= filters.created_after)
+        if filters.created_before:
+            stmt = stmt.where(models.Application.created_at < filters.created_before)
+
+    owners = dict(db.execute(stmt).all())
+    updated_ids = sorted(owners)
+    if updated_ids:
+        meta = json.dumps({"new_status": status, "bulk": True})
+        logged = db.execute(
+            insert(models.AuditLog).returning(models.AuditLog.id, models.AuditLog.target_id),
+            [
+                {
+                    "actor_user_id": actor_user_id,
+                    "action": "APPLICATION_STATUS_CHANGED",
+                    "target_id": app_id,
+                    "meta": meta,
+                }
+                for app_id in updated_ids
+            ],
+        )
+        events.publish(db, [
+            {"id": log_id, "user_id": owners[app_id], "application_id": app_id, "status": status}
+            for log_id, app_id in logged
+        ])
+        if status == "PENDING":
+            waiting_list_enter(db, *updated_ids)
+        else:
+            waiting_list_leave(db, *updated_ids)
+    db.commit()
+    return updated_ids
+
+
+def purge_applications(
+    db: Session,
+    status: str,
+    older_than_days: int,
+    actor_user_id: int,
+    batch_size: int = PURGE_BATCH_SIZE,
+) -> int:
+    """Delete applications in `status` created more than `older_than_days` ago."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    criteria = [models.Application.status == status, models.Application.created_at < cutoff]
+    deleted = _delete_in_batches(
+        db, models.Application, criteria, batch_size,
+        on_batch=lambda ids: tombstone_applications(db, models.Application.id.in_(ids)),
+    )
+    log_action(
+        db,
+        actor_user_id=actor_user_id,
+        action="APPLICATIONS_PURGED",
+        meta={"status": status, "older_than_days": older_than_days, "deleted": deleted},
+    )
+    return deleted
+
+
+# ------------------ WAITING LIST ------------------
+# Queue order: numeric waiting-list number (missing numbers last), then age.
+# Entries store that order; positions are counted on demand from its index.
+_NO_NUMBER = 2 ** 62
+
+
+def waiting_list_enter(db: Session, *application_ids: int):
+    """
+    Queue the given applications that are PENDING and not queued yet.
+    A single INSERT ... SELECT; nothing else in the queue is touched. Does not commit.
+    """
+    A, P = models.Application, models.WaitingListPosition
+    queued = select(P.application_id).where(P.application_id == A.id).exists()
+    rows = select(A.id, func.coalesce(A.waiting_list_key, _NO_NUMBER), A.created_at).where(
+        A.id.in_(application_ids), A.status == "PENDING", ~queued
+    )
+    db.execute(insert(P).from_select(["application_id", "sort_key", "created_at"], rows))
+
+
+def waiting_list_leave(db: Session, *application_ids: int):
+    """Take applications out of the queue. Does not commit."""
+    P = models.WaitingListPosition
+    db.execute(delete(P).where(P.application_id.in_(application_ids)))
+
+
+def rebuild_waiting_list(db: Session) -> int:
+    """Recreate every queue entry from the PENDING applications; commits."""
+    A, P = models.Application, models.WaitingListPosition
+    db.execute(delete(P))
+    rows = select(A.id, func.coalesce(A.waiting_list_key, _NO_NUMBER), A.created_at).where(A.status == "PENDING")
+    db.execute(insert(P).from_select(["application_id", "sort_key", "created_at"], rows))
+    db.commit()
+    return db.query(P).count()
+
+
+def get_waiting_list_position(db: Session, application_id: int):
+    """(position, queue length); position is None when not in the queue."""
+    P = models.WaitingListPosition
+    return db.execute(
+        select(
+            select(models.Application.queue_position)
+            .where(models.Application.id == application_id)
+            .scalar_subquery(),
+            select(func.count()).select_from(P).scalar_subquery(),
+        )
+    ).one()
 
 
 # ------------------ NEXT OF KIN ------------------
 def add_next_of_kin(db: Session, kin: schemas.NextOfKinCreate, application_id: int, actor_user_id: int = None):
-    db_kin = models.NextOfKin(application_id=application_id, **kin.dict())
+    db_kin = models.NextOfKin(application_id=application_id, **kin.model_dump())
     db.add(db_kin)
     db.commit()
     db.refresh(db_kin)
@@ -220,7 +788,7 @@ def add_next_of_kin(db: Session, kin: schemas.NextOfKinCreate, application_id: i
 
 # ------------------ SPOUSE ------------------
 def add_spouse(db: Session, spouse: schemas.SpouseCreate, application_id: int, actor_user_id: int = None):
-    db_spouse = models.Spouse(application_id=application_id, **spouse.dict())
+    db_spouse = models.Spouse(application_id=application_id, **spouse.model_dump())
     db.add(db_spouse)
     db.commit()
     db.refresh(db_spouse)
@@ -237,7 +805,7 @@ def add_spouse(db: Session, spouse: schemas.SpouseCreate, application_id: int, a
 
 # ------------------ BENEFICIARIES ------------------
 def add_beneficiary(db: Session, beneficiary: schemas.BeneficiaryCreate, application_id: int, actor_user_id: int = None):
-    db_ben = models.Beneficiary(application_id=application_id, **beneficiary.dict())
+    db_ben = models.Beneficiary(application_id=application_id, **beneficiary.model_dump())
     db.add(db_ben)
     db.commit()
     db.refresh(db_ben)
@@ -254,9 +822,13 @@ def add_beneficiary(db: Session, beneficiary: schemas.BeneficiaryCreate, applica
 
 # ------------------ PAYMENTS ------------------
 def add_payment(db: Session, payment: schemas.PaymentCreate, application_id: int, actor_user_id: int = None):
-    db_payment = models.Payment(application_id=application_id, **payment.dict())
+    db_payment = models.Payment(application_id=application_id, **payment.model_dump())
     db.add(db_payment)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise
     db.refresh(db_payment)
     if actor_user_id is not None:
         log_action(
@@ -270,6 +842,126 @@ def add_payment(db: Session, payment: schemas.PaymentCreate, application_id: int
 
 
 
+def _dialect_insert(db: Session, model):
+    """INSERT supporting ON CONFLICT for the session's database."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    return dialect_insert(model)
+
+
+def _match_applications(db: Session, rows: Sequence[schemas.PaymentImportRow]) -> dict:
+    """Map each row's receipt number to one application id, in a single query."""
+    ids = {r.application_id for r in rows if r.application_id}
+    numbers = {r.council_waiting_list_number for r in rows if r.council_waiting_list_number}
+    id_numbers = {r.id_number for r in rows if r.id_number}
+    A = models.Application
+    found = db.execute(
+        select(A.id, A.council_waiting_list_number, A.id_number).where(
+            or_(A.id.in_(ids), A.council_waiting_list_number.in_(numbers), A.id_number.in_(id_numbers))
+        )
+    ).all()
+    by_number, by_id_number = {}, {}
+    for app_id, number, id_number in found:
+        by_number.setdefault(number, set()).add(app_id)
+        by_id_number.setdefault(id_number, set()).add(app_id)
+    known_ids = {row.id for row in found}
+
+    matches = {}
+    for r in rows:
+        if r.application_id:
+            candidates = {r.application_id} & known_ids
+        elif r.council_waiting_list_number:
+            candidates = by_number.get(r.council_waiting_list_number, set())
+        else:
+            candidates = by_id_number.get(r.id_number, set())
+        if len(candidates) == 1:  # none or ambiguous stays unmatched
+            matches[r.receipt_number] = next(iter(candidates))
+    return matches
+
+
+def import_payments(db: Session, data: schemas.PaymentImport, actor_user_id: int = None) -> schemas.PaymentImportResult:
+    """
+    Record a batch of bank receipts with INSERT ... ON CONFLICT
+    (receipt_number) DO NOTHING, or DO UPDATE when on_conflict="update",
+    in one transaction. Rows already recorded never abort the batch.
+    """
+    result = schemas.PaymentImportResult()
+    rows, seen = [], set()
+    for r in data.payments:
+        if r.receipt_number in seen:
+            result.duplicates.append(r.receipt_number)
+        else:
+            seen.add(r.receipt_number)
+            rows.append(r)
+    if not rows:
+        return result
+
+    matches = _match_applications(db, rows)
+    values = []
+    for r in rows:
+        if r.receipt_number not in matches:
+            result.unmatched.append(r.receipt_number)
+            continue
+        values.append({
+            "application_id": matches[r.receipt_number],
+            "amount": r.amount,
+            "currency": r.currency,
+            "description": r.description,
+            "receipt_number": r.receipt_number,
+        })
+    if not values:
+        return result
+
+    fields = ("application_id", "amount", "currency", "description")
+    P = models.Payment
+    existing = {
+        row.receipt_number: row
+        for row in db.execute(
+            select(P.receipt_number, *(getattr(P, f) for f in fields))
+            .where(P.receipt_number.in_([v["receipt_number"] for v in values]))
+        )
+    }
+
+    stmt = _dialect_insert(db, P)
+    if data.on_conflict == "update":
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[P.receipt_number],
+            set_={f: stmt.excluded[f] for f in fields},
+            where=or_(*(getattr(P, f).is_distinct_from(stmt.excluded[f]) for f in fields)),
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[P.receipt_number])
+    written = set(db.scalars(stmt.returning(P.receipt_number), values).all())
+    # Core upserts bypass the flush hook that touches parent applications
+    touch_applications(db, {
+        app_id
+        for v in values if v["receipt_number"] in written
+        for app_id in (v["application_id"], getattr(existing.get(v["receipt_number"]), "application_id", None))
+        if app_id is not None
+    })
+
+    for v in values:
+        receipt = v["receipt_number"]
+        before = existing.get(receipt)
+        if receipt in written:
+            (result.updated if before else result.inserted).append(receipt)
+        elif before is None or all(getattr(before, f) == v[f] for f in fields):
+            result.duplicates.append(receipt)  # unchanged, or inserted concurrently
+        else:
+            result.conflicts.append(receipt)
+
+    log_action(
+        db,
+        actor_user_id=actor_user_id,
+        action="PAYMENTS_IMPORTED",
+        meta={k: len(v) for k, v in result.model_dump().items()},
+        commit=False,
+    )
+    db.commit()
+    return result
+
 
 # ------------------ DOCUMENTS ------------------
 # def add_document(db: Session, application_id: int, file: UploadFile, kind: str):
@@ -305,39 +997,23 @@ def add_payment(db: Session, payment: schemas.PaymentCreate, application_id: int
 #         )
 #     return db_doc
 
-async def add_document(
+def add_document(
     db: Session,
     application_id: int,
-    file: UploadFile,
     kind: str,
+    stored: "storage.StoredObject",
     actor_user_id: int | None = None,
 ):
     """
-    Upload file to Vercel Blob and insert metadata into DB
+    Insert metadata of a file already saved by storage.save()
     """
-    if not BLOB_TOKEN:
-        raise RuntimeError("Missing BLOB_READ_WRITE_TOKEN environment variable")
-
-    # read file content
-    file_bytes = await file.read()
-
-    # upload to vercel blob
-    async with httpx.AsyncClient() as client:
-        files = {"file": (file.filename, file_bytes, file.content_type)}
-        headers = {"Authorization": f"Bearer {BLOB_TOKEN}"}
-        resp = await client.post(BLOB_API_URL, files=files, headers=headers)
-
-    if resp.status_code != 200:
-        raise RuntimeError(f"Vercel Blob upload failed: {resp.text}")
-
-    blob_data = resp.json()
-    blob_url = blob_data["url"]  # permanent public URL
-
-    # save metadata in DB
     db_doc = models.Document(
         application_id=application_id,
         kind=kind,
-        path=blob_url,  # now stores blob URL instead of local path
+        path=stored.path,  # blob URL or local file path
+        size=stored.size,
+        content_type=stored.content_type,
+        checksum=stored.checksum,
     )
     db.add(db_doc)
     db.commit()
@@ -350,11 +1026,310 @@ async def add_document(
             actor_user_id=actor_user_id,
             action="DOCUMENT_UPLOADED",
             target_id=application_id,
-            meta={"document_id": db_doc.id, "kind": kind, "url": blob_url},
+            meta={"document_id": db_doc.id, "kind": kind, "path": stored.path},
         )
 
     return db_doc
 
 
+def get_document_for_download(db: Session, application_id: int, document_id: int):
+    """(document, owner user_id) in one query, or None."""
+    return db.execute(
+        select(models.Document, models.Application.user_id)
+        .join(models.Application, models.Application.id == models.Document.application_id)
+        .where(models.Document.id == document_id, models.Document.application_id == application_id)
+    ).first()
+
+
 def get_documents_by_application(db: Session, application_id: int):
-    return db.query(models.Document).filter(models.Document.application_id == application_id).all()
\ No newline at end of file
+    return db.query(models.Document).filter(models.Document.application_id == application_id).all()
+
+# ------------------ IDEMPOTENCY KEYS ------------------
+def claim_idempotency_key(
+    db: Session,
+    user_id: int,
+    key: str,
+    method: str,
+    path: str,
+    request_hash: str,
+    ttl_seconds: int,
+    lock_timeout: int,
+):
+    """
+    Try to take `key` for a new request. Returns (record, claimed); when
+    claimed is False the record belongs to an earlier request with the
+    same key. Expired records and in-progress records older than
+    `lock_timeout` (their request died) are taken over.
+    """
+    now = datetime.now(timezone.utc)
+    record = models.IdempotencyKey(
+        user_id=user_id, key=key, method=method, path=path, request_hash=request_hash,
+        status="IN_PROGRESS", locked_at=now, expires_at=now + timedelta(seconds=ttl_seconds),
+    )
+    db.add(record)
+    try:
+        db.commit()
+        return record, True
+    except IntegrityError:
+        db.rollback()
+
+    existing = (
+        db.query(models.IdempotencyKey)
+        .filter(models.IdempotencyKey.user_id == user_id, models.IdempotencyKey.key == key)
+        .first()
+    )
+    if existing is None:  # released in the meantime
+        return claim_idempotency_key(db, user_id, key, method, path, request_hash, ttl_seconds, lock_timeout)
+    stale_before = now - timedelta(seconds=lock_timeout)
+    stale = existing.status == "IN_PROGRESS" and _aware(existing.locked_at) < stale_before
+    if _aware(existing.expires_at) < now or stale:
+        # the condition is repeated in the UPDATE so only one of several concurrent retries wins
+        taken = db.execute(
+            update(models.IdempotencyKey)
+            .where(
+                models.IdempotencyKey.id == existing.id,
+                or_(
+                    models.IdempotencyKey.expires_at < now,
+                    and_(models.IdempotencyKey.status == "IN_PROGRESS", models.IdempotencyKey.locked_at < stale_before),
+                ),
+            )
+            .values(
+                method=method, path=path, request_hash=request_hash, status="IN_PROGRESS",
+                response_status=None, response_content_type=None, response_headers=None, response_body=None,
+                locked_at=now, expires_at=now + timedelta(seconds=ttl_seconds),
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        db.refresh(existing)
+        return existing, bool(taken)
+    return existing, False
+
+
+def _aware(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes even for timezone=True columns
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _held_claim(record_id: int, claimed_at: datetime):
+    # locked_at identifies the claim: a takeover of a stale key sets a new one
+    K = models.IdempotencyKey
+    return (K.id == record_id, K.status == "IN_PROGRESS", K.locked_at == claimed_at)
+
+
+def complete_idempotency_key(
+    db: Session,
+    record_id: int,
+    claimed_at: datetime,
+    status: int,
+    content_type: Optional[str],
+    body: bytes,
+    headers: Optional[list] = None,
+):
+    """Store the response, unless the claim was taken over in the meantime."""
+    db.execute(
+        update(models.IdempotencyKey)
+        .where(*_held_claim(record_id, claimed_at))
+        .values(
+            status="COMPLETED",
+            response_status=status,
+            response_content_type=content_type,
+            response_headers=json.dumps(headers or []),
+            response_body=body,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def release_idempotency_key(db: Session, record_id: int, claimed_at: datetime):
+    """Forget a key whose request failed, so the client can retry it (unless it was taken over)."""
+    db.execute(
+        delete(models.IdempotencyKey).where(*_held_claim(record_id, claimed_at)),
+        execution_options={"synchronize_session": False},
+    )
+    db.commit()
+
+
+def purge_expired_idempotency_keys(db: Session) -> int:
+    deleted = (
+        db.query(models.IdempotencyKey)
+        .filter(models.IdempotencyKey.expires_at < datetime.now(timezone.utc))
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return deleted
+
+
+# ------------------ JOBS ------------------
+class LeaseLost(Exception):
+    """The job was reclaimed by another worker; this one must stop writing to it."""
+
+
+def enqueue_job(
+    db: Session,
+    kind: str,
+    payload: Optional[dict] = None,
+    created_by: int = None,
+    max_attempts: int = 3,
+    commit: bool = True,
+) -> models.Job:
+    """
+    Queue `kind` (a handler in app.jobs.handlers) for `python -m app.worker`.
+    Pass commit=False to enqueue inside the caller's transaction.
+    """
+    job = models.Job(
+        kind=kind,
+        payload=json.dumps(payload or {}),
+        status="QUEUED",
+        attempts=0,
+        max_attempts=max_attempts,
+        progress=0.0,
+        run_at=datetime.now(timezone.utc),
+        created_by=created_by,
+    )
+    db.add(job)
+    if commit:
+        db.commit()
+        db.refresh(job)
+    return job
+
+
+def claim_job(db: Session, worker_id: str, lock_timeout: int) -> Optional[models.Job]:
+    """
+    Take the next due job, or a running one whose worker stopped renewing
+    its lease for `lock_timeout` seconds and has attempts left; stale jobs
+    without attempts left are marked FAILED. SKIP LOCKED lets concurrent
+    workers claim different jobs without waiting on each other.
+    """
+    now = datetime.now(timezone.utc)
+    J = models.Job
+    stale = and_(J.status == "RUNNING", J.locked_at < now - timedelta(seconds=lock_timeout))
+    # a job that keeps killing its worker (OOM, segfault) never reaches fail_job
+    db.execute(
+        update(J)
+        .where(stale, J.attempts >= J.max_attempts)
+        .values(
+            status="FAILED", locked_at=None, locked_by=None, finished_at=now,
+            error="Worker stopped responding on the last attempt",
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    job = db.scalars(
+        select(J)
+        .where(or_(
+            and_(J.status == "QUEUED", J.run_at <= now),
+            and_(stale, J.attempts < J.max_attempts),
+        ))
+        .order_by(J.run_at, J.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    ).first()
+    if job is None:
+        db.rollback()
+        return None
+    # guarded by the previous status/attempts, so a database without
+    # row locks (SQLite in development) still hands a job to one worker only
+    claimed = db.execute(
+        update(J)
+        .where(J.id == job.id, J.status == job.status, J.attempts == job.attempts)
+        .values(
+            status="RUNNING", attempts=job.attempts + 1, locked_at=now, locked_by=worker_id,
+            started_at=job.started_at or now, error=None,
+        )
+    ).rowcount
+    db.commit()
+    if not claimed:
+        return None
+    db.refresh(job)
+    return job
+
+
+def _held_lease(job_id: int, worker_id: str):
+    J = models.Job
+    return (J.id == job_id, J.status == "RUNNING", J.locked_by == worker_id)
+
+
+def renew_job_lease(db: Session, job_id: int, worker_id: str) -> bool:
+    """Push back the job's lock timeout; False if another worker took the job."""
+    renewed = db.execute(
+        update(models.Job).where(*_held_lease(job_id, worker_id)).values(locked_at=datetime.now(timezone.utc))
+    ).rowcount
+    db.commit()
+    return renewed > 0
+
+
+def update_job_progress(db: Session, job_id: int, worker_id: str, progress: float, message: Optional[str] = None):
+    """Record progress; this also renews the job's lock. Raises LeaseLost if another worker took the job."""
+    renewed = db.execute(
+        update(models.Job)
+        .where(*_held_lease(job_id, worker_id))
+        .values(progress=min(max(progress, 0.0), 1.0), progress_message=message, locked_at=datetime.now(timezone.utc))
+    ).rowcount
+    db.commit()
+    if not renewed:
+        raise LeaseLost(f"job {job_id} is no longer held by {worker_id}")
+
+
+def finish_job(db: Session, job_id: int, worker_id: str, result=None, artifact_path: Optional[str] = None) -> bool:
+    """Mark the job SUCCEEDED; False, with nothing written, if the lease was lost."""
+    finished = db.execute(
+        update(models.Job)
+        .where(*_held_lease(job_id, worker_id))
+        .values(
+            status="SUCCEEDED", progress=1.0, result=json.dumps(result), artifact_path=artifact_path,
+            locked_at=None, locked_by=None, finished_at=datetime.now(timezone.utc),
+        )
+    ).rowcount
+    db.commit()
+    return finished > 0
+
+
+def fail_job(db: Session, job_id: int, worker_id: str, error: str, retry_base_seconds: int) -> bool:
+    """
+    Re-queue with exponential backoff, or mark FAILED after the last attempt.
+    False, with nothing written, if the lease was lost.
+    """
+    J = models.Job
+    job = db.execute(select(J.attempts, J.max_attempts).where(*_held_lease(job_id, worker_id))).first()
+    if job is None:
+        db.rollback()
+        return False
+    now = datetime.now(timezone.utc)
+    values = {"error": error, "locked_at": None, "locked_by": None}
+    if job.attempts < job.max_attempts:
+        values.update(status="QUEUED", run_at=now + timedelta(seconds=retry_base_seconds * 2 ** (job.attempts - 1)))
+    else:
+        values.update(status="FAILED", finished_at=now)
+    # attempts in the guard too: a reclaim between the read and here bumps it
+    failed = db.execute(update(J).where(*_held_lease(job_id, worker_id), J.attempts == job.attempts).values(**values)).rowcount
+    db.commit()
+    return failed > 0
+
+
+def retry_job(db: Session, job_id: int) -> Optional[models.Job]:
+    """Queue a FAILED job again with a fresh set of attempts."""
+    job = db.get(models.Job, job_id)
+    if job is None or job.status != "FAILED":
+        return None
+    job.status = "QUEUED"
+    job.attempts = 0
+    job.run_at = datetime.now(timezone.utc)
+    job.finished_at = None
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def get_job(db: Session, job_id: int):
+    return db.get(models.Job, job_id)
+
+
+def list_jobs(db: Session, skip: int = 0, limit: int = 100, status: Optional[str] = None, kind: Optional[str] = None):
+    query = db.query(models.Job)
+    if status:
+        query = query.filter(models.Job.status == status)
+    if kind:
+        query = query.filter(models.Job.kind == kind)
+    return query.order_by(models.Job.id.desc()).offset(skip).limit(limit).all()
@@ -2,11 +2,260 @@
 Database configurations
  """
 
-from sqlalchemy import create_engine
+import itertools
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from .config import DATABASE_URL
+from .config import (
+    DATABASE_REPLICA_URLS,
+    DATABASE_URL,
+    DB_MAX_OVERFLOW,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    REPLICA_HEALTH_INTERVAL,
+    REPLICA_MAX_LAG_SECONDS,
+    SQL_INSTRUMENTATION,
+    SQL_SLOW_MS,
+    SQL_REPEAT_THRESHOLD,
+)
+
 
+def pool_options(url: str) -> dict:
+    """Per-process pool sizing; SQLite keeps SQLAlchemy's own pool choice."""
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
 
-engine = create_engine(DATABASE_URL, future=True, echo=False)
+
+engine = create_engine(DATABASE_URL, future=True, echo=False, **pool_options(DATABASE_URL))
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 Base = declarative_base()
+
+logger = logging.getLogger("app.sql")
+
+
+@event.listens_for(Engine, "connect")
+def _sqlite_foreign_keys(dbapi_connection, connection_record):
+    # deletes rely on ON DELETE CASCADE, which SQLite only enforces when asked
+    if type(dbapi_connection).__module__.startswith("sqlite3"):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+
+# ------------------ Read replicas ------------------
+class ReplicaPool:
+    """
+    Round-robin over the replica engines that passed their last health
+    check. A replica is healthy when it answers and its replay lag is at
+    most REPLICA_MAX_LAG_SECONDS. A background thread, started by the
+    first pick() in each process, re-checks every REPLICA_HEALTH_INTERVAL
+    seconds, so requests never wait on a check.
+    """
+
+    def __init__(self, urls, max_lag: float, interval: float):
+        self.engines = [create_engine(url, future=True, pool_pre_ping=True, **pool_options(url)) for url in urls]
+        self.max_lag = max_lag
+        self.interval = interval
+        self.healthy = list(self.engines)
+        self._cycle = itertools.cycle(self.healthy)
+        self._refresher = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def _lag(self, replica) -> float:
+        with replica.connect() as conn:
+            if replica.dialect.name != "postgresql":
+                conn.execute(text("SELECT 1"))
+                return 0.0
+            # an idle primary sends no WAL; fully replayed counts as no lag
+            return conn.execute(text(
+                "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+            )).scalar()
+
+    def check(self):
+        healthy = []
+        for replica in self.engines:
+            name = replica.url.render_as_string(hide_password=True)
+            try:
+                lag = self._lag(replica)
+            except Exception as exc:
+                logger.warning("replica %s unavailable: %s", name, exc)
+                continue
+            if lag > self.max_lag:
+                logger.warning("replica %s lagging %.1fs, skipped", name, lag)
+                continue
+            healthy.append(replica)
+        self.healthy = healthy
+        self._cycle = itertools.cycle(healthy)
+
+    def _refresh(self):
+        while not self._stop.is_set():
+            try:
+                self.check()
+            except Exception:
+                logger.exception("replica health check failed")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Start the health-check thread of this process, once (also after a fork)."""
+        if self._refresher is not None and self._refresher.is_alive():
+            return
+        with self._lock:
+            if self._refresher is None or not self._refresher.is_alive():
+                self._stop.clear()
+                self._refresher = threading.Thread(target=self._refresh, name="replica-health", daemon=True)
+                self._refresher.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def pick(self) -> Optional[Engine]:
+        """Next healthy replica, or None to fall back to the primary."""
+        self.start()
+        if not self.healthy:
+            return None
+        return next(self._cycle)
+
+
+replicas = ReplicaPool(DATABASE_REPLICA_URLS, REPLICA_MAX_LAG_SECONDS, REPLICA_HEALTH_INTERVAL) if DATABASE_REPLICA_URLS else None
+
+
+def all_engines() -> list:
+    return [engine] + (replicas.engines if replicas else [])
+
+
+def dispose_engines():
+    """Close every pooled connection of this process, e.g. at shutdown."""
+    if replicas:
+        replicas.stop()
+    for each in all_engines():
+        each.dispose()
+
+
+def _forget_inherited_pools():
+    # a forked child must not reuse the parent's sockets; close=False leaves
+    # them open for the parent and just gives the child empty pools
+    for each in all_engines():
+        each.dispose(close=False)
+
+
+os.register_at_fork(after_in_child=_forget_inherited_pools)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _flushed(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _orm_execute(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _committed(session):
+    # request sessions carry the request's state; ReadYourWritesMiddleware
+    # hands the write time to the client
+    state = session.info.get("request_state")
+    if session.info.pop("wrote", False) and state is not None:
+        state.last_write = time.time()
+
+
+# ------------------ SQL instrumentation ------------------
+class InstrumentationSettings:
+    """Runtime switches for the engine hooks below (per worker)."""
+
+    def __init__(self):
+        self.enabled = SQL_INSTRUMENTATION
+        self.slow_ms = SQL_SLOW_MS
+        self.repeat_threshold = SQL_REPEAT_THRESHOLD
+
+
+class QueryStats:
+    """Statements executed on behalf of one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.statements = Counter()
+
+    def repeated(self, threshold: int):
+        """Normalized statements run more than `threshold` times (likely N+1)."""
+        return [(sql, n) for sql, n in self.statements.most_common() if n > threshold]
+
+
+instrumentation = InstrumentationSettings()
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+_WHITESPACE = re.compile(r"\s+")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PARAM_LISTS = re.compile(r"\(\s*(?:\?|%\(\w+\)s|%s|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|%s|:\w+))*\s*\)")
+
+
+def normalize_statement(statement: str) -> str:
+    """Collapse literals, whitespace and IN-lists so equivalent statements compare equal."""
+    sql = _LITERALS.sub("?", statement)
+    sql = _PARAM_LISTS.sub("(?)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def redact_parameters(parameters):
+    """Keep parameter names and types only; values may hold personal data."""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return [redact_parameters(parameters[0]), f"... {len(parameters)} rows"]
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if instrumentation.enabled:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.total_ms += elapsed_ms
+        stats.statements[normalize_statement(statement)] += 1
+
+    if elapsed_ms >= instrumentation.slow_ms:
+        logger.warning(
+            "slow query (%.1f ms): %s params=%s",
+            elapsed_ms,
+            _WHITESPACE.sub(" ", statement).strip(),
+            redact_parameters(parameters),
+        )
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
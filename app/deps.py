@@ -1,30 +1,33 @@
 """
 Dependencies for FastAPI routes.
+Authentication dependencies live in app.auth.security.
 """
-from fastapi import Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from fastapi.security import OAuth2PasswordBearer
-from .db import SessionLocal
+from fastapi import Request
 
-from .db import SessionLocal
-from jose import JWTError, jwt
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from .db import SessionLocal, replicas
+from .read_your_writes import wrote_recently
 
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
-
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
-
-def get_db():
+def get_db(request: Request):
     db = SessionLocal()
+    db.info["request_state"] = request.state
     try:
         yield db
     finally:
         db.close()
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    user = verify_token_get_user(token, db)
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication")
-    return user
+
+def get_read_db(request: Request):
+    """
+    Session for read-only endpoints. Uses a healthy replica when replicas
+    are configured, unless the request says its client wrote in the last
+    READ_YOUR_WRITES_SECONDS (see app.read_your_writes); otherwise (or
+    when no replica is healthy) the session is on the primary.
+    """
+    replica = replicas.pick() if replicas and not wrote_recently(request) else None
+    db = SessionLocal(bind=replica) if replica is not None else SessionLocal()
+    db.info["request_state"] = request.state
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,157 @@
+"""
+Application status-change events, pushed to applicants over SSE.
+
+crud.update_application_status (and the bulk variant) call publish() with
+the audit-log entry of each change; its id is the event id, so a client
+reconnecting with Last-Event-ID gets what it missed replayed from
+audit_logs.
+
+Delivery inside a worker goes through an in-process broker of per-user
+asyncio queues. With EVENTS_PG_NOTIFY=1 on Postgres, publish() instead
+sends NOTIFY inside the writing transaction and every worker runs one
+LISTEN connection that feeds its broker, so a change made on any worker
+reaches subscribers connected to any other.
+"""
+
+import asyncio
+import json
+import logging
+import select
+import threading
+from collections import defaultdict
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import NullPool
+
+from .config import EVENTS_PG_NOTIFY, EVENTS_QUEUE_SIZE
+from .db import SessionLocal, engine
+
+logger = logging.getLogger("app.events")
+
+CHANNEL = "application_events"
+
+
+class Broker:
+    """Fans events out to the asyncio queues of one user's open streams."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)  # user_id -> {(loop, queue)}
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=EVENTS_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers[user_id].add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue):
+        with self._lock:
+            self._subscribers[user_id] = {s for s in self._subscribers[user_id] if s[1] is not queue}
+            if not self._subscribers[user_id]:
+                del self._subscribers[user_id]
+
+    def dispatch(self, event: dict):
+        """Deliver to local subscribers; safe to call from any thread."""
+        with self._lock:
+            targets = list(self._subscribers.get(event["user_id"], ()))
+        for loop, queue in targets:
+            loop.call_soon_threadsafe(_offer, queue, event)
+
+    def close_all(self):
+        """End every open stream (clients reconnect elsewhere), e.g. on shutdown."""
+        with self._lock:
+            targets = [s for subscribers in self._subscribers.values() for s in subscribers]
+        for loop, queue in targets:
+            loop.call_soon_threadsafe(_close, queue)
+
+
+def _offer(queue: asyncio.Queue, event: dict):
+    # a stalled client loses live events rather than growing the queue;
+    # it catches up through Last-Event-ID replay when it reconnects
+    if not queue.full():
+        queue.put_nowait(event)
+
+
+def _close(queue: asyncio.Queue):
+    while not queue.empty():
+        queue.get_nowait()  # make room; undelivered events are replayed on reconnect
+    queue.put_nowait(None)
+
+
+broker = Broker()
+
+
+def format_event(item: dict) -> str:
+    """One SSE frame; the id is what the client sends back as Last-Event-ID."""
+    data = {key: item[key] for key in ("application_id", "status")}
+    return f"id: {item['id']}\nevent: status\ndata: {json.dumps(data)}\n\n"
+
+
+def _use_notify(db) -> bool:
+    return EVENTS_PG_NOTIFY and db.get_bind().dialect.name == "postgresql"
+
+
+def publish(db, events: list):
+    """
+    Publish status-change events ({"id", "user_id", "application_id",
+    "status"}) from inside the writing transaction. They are delivered
+    only once it commits, and dropped if it rolls back.
+    """
+    if not events:
+        return
+    if _use_notify(db):
+        for item in events:
+            db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": json.dumps(item)})
+    else:
+        db.info.setdefault("pending_events", []).extend(events)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _dispatch_pending(session):
+    for item in session.info.pop("pending_events", ()):
+        broker.dispatch(item)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _drop_pending(session):
+    session.info.pop("pending_events", None)
+
+
+def _listen_forever():
+    """
+    Blocking LISTEN loop on a dedicated connection; reconnects on failure.
+    The connection comes from an unpooled engine of its own, so it is not
+    taken from the request pool (sized by the connection budget) and is
+    really closed, autocommit and all, when it fails.
+    """
+    listen_engine = create_engine(engine.url, poolclass=NullPool)
+    while True:
+        try:
+            conn = listen_engine.raw_connection()
+            try:
+                conn.dbapi_connection.autocommit = True
+                cursor = conn.cursor()
+                cursor.execute(f"LISTEN {CHANNEL}")
+                while True:
+                    if select.select([conn.dbapi_connection], [], [], 30) == ([], [], []):
+                        continue
+                    conn.dbapi_connection.poll()
+                    while conn.dbapi_connection.notifies:
+                        notify = conn.dbapi_connection.notifies.pop(0)
+                        broker.dispatch(json.loads(notify.payload))
+            finally:
+                conn.close()
+        except Exception:
+            logger.exception("event listener connection lost, reconnecting")
+            threading.Event().wait(5)
+
+
+_listener = None
+
+
+def start_listener():
+    """Start this worker's LISTEN thread once, when NOTIFY fan-out is enabled."""
+    global _listener
+    if _listener is None and EVENTS_PG_NOTIFY and engine.dialect.name == "postgresql":
+        _listener = threading.Thread(target=_listen_forever, name="events-listener", daemon=True)
+        _listener.start()
@@ -0,0 +1,187 @@
+"""
+Idempotency-Key support for mutating requests.
+
+A client that may retry a POST/PUT/PATCH/DELETE sends a unique
+`Idempotency-Key` header. The first request with a key claims it in the
+idempotency_keys table (scoped to the authenticated user) and its
+response is stored once it finishes. A retry with the same key and the
+same request gets the stored response (status, headers and body) back, marked with
+`Idempotent-Replayed: true`, without running the endpoint again.
+
+- same key, different request body, path or query string: 422
+- same key while the first request is still running: 409 + Retry-After
+- 5xx responses and crashes release the key, so the client can retry
+
+Keys expire after IDEMPOTENCY_TTL_SECONDS; expired rows are purged
+periodically. Requests without the header, or without a valid bearer
+token, are passed through untouched.
+"""
+
+import hashlib
+import json
+import time
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from . import crud
+from .auth.security import get_current_user
+from .config import IDEMPOTENCY_LOCK_TIMEOUT, IDEMPOTENCY_PURGE_INTERVAL, IDEMPOTENCY_TTL_SECONDS
+from .db import SessionLocal
+
+MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# recomputed or set by the server on every response, so not stored for replays
+UNSTORED_HEADERS = {b"content-type", b"content-length", b"date", b"server", b"transfer-encoding", b"connection"}
+MAX_KEY_LENGTH = 255
+MAX_PATH_LENGTH = 500  # idempotency_keys.path; the hash covers the full path
+
+_last_purge = 0.0
+
+
+def _request_hash(method: str, path: str, body: bytes) -> str:
+    digest = hashlib.sha256(f"{method} {path}\n".encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def _claim(authorization: str, key: str, method: str, path: str, request_hash: str):
+    """Resolve the user and claim the key. Returns (record, claimed) or None if unauthenticated."""
+    global _last_purge
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    db = SessionLocal()
+    try:
+        try:
+            user = get_current_user(token, db)
+        except HTTPException:
+            return None
+        if time.monotonic() - _last_purge > IDEMPOTENCY_PURGE_INTERVAL:
+            _last_purge = time.monotonic()
+            crud.purge_expired_idempotency_keys(db)
+        record, claimed = crud.claim_idempotency_key(
+            db, user.id, key, method, path, request_hash, IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_LOCK_TIMEOUT
+        )
+        db.refresh(record)
+        db.expunge(record)  # read after the session closes
+        return record, claimed
+    finally:
+        db.close()
+
+
+def _finish(record, status: int, content_type, headers: list, body: bytes):
+    db = SessionLocal()
+    try:
+        if status >= 500:
+            crud.release_idempotency_key(db, record.id, record.locked_at)
+        else:
+            crud.complete_idempotency_key(db, record.id, record.locked_at, status, content_type, body, headers)
+    finally:
+        db.close()
+
+
+def _release(record):
+    db = SessionLocal()
+    try:
+        crud.release_idempotency_key(db, record.id, record.locked_at)
+    finally:
+        db.close()
+
+
+async def _respond(send, status: int, body: bytes, content_type: str = "application/json", extra_headers=()):
+    headers = [(b"content-type", content_type.encode()), (b"content-length", str(len(body)).encode())]
+    await send({"type": "http.response.start", "status": status, "headers": headers + list(extra_headers)})
+    await send({"type": "http.response.body", "body": body})
+
+
+def _error(detail: str) -> bytes:
+    return json.dumps({"detail": detail}).encode()
+
+
+class IdempotencyMiddleware:
+    """Pure ASGI middleware; buffers the request body to hash and replay it."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in MUTATING_METHODS:
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        key = headers.get(b"idempotency-key", b"").decode().strip()
+        if not key:
+            await self.app(scope, receive, send)
+            return
+        if len(key) > MAX_KEY_LENGTH:
+            await _respond(send, 400, _error(f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters"))
+            return
+
+        messages, body = [], b""
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                break
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+
+        method, path = scope["method"], scope["path"]
+        query_string = scope.get("query_string", b"").decode("latin-1")
+        if query_string:
+            path = f"{path}?{query_string}"  # e.g. ?status= on v2 status updates is part of the request
+        request_hash = _request_hash(method, path, body)
+        claim = await run_in_threadpool(
+            _claim, headers.get(b"authorization", b"").decode(), key, method, path[:MAX_PATH_LENGTH], request_hash
+        )
+
+        async def replay_receive():
+            if messages:
+                return messages.pop(0)
+            return await receive()
+
+        if claim is None:
+            await self.app(scope, replay_receive, send)
+            return
+
+        record, claimed = claim
+        if not claimed:
+            if record.request_hash != request_hash:
+                await _respond(send, 422, _error("Idempotency-Key was already used for a different request"))
+            elif record.status != "COMPLETED":
+                await _respond(
+                    send, 409, _error("A request with this Idempotency-Key is still in progress"),
+                    extra_headers=[(b"retry-after", b"1")],
+                )
+            else:
+                stored = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in json.loads(record.response_headers or "[]")]
+                await _respond(
+                    send, record.response_status, record.response_body or b"",
+                    record.response_content_type or "application/json",
+                    extra_headers=stored + [(b"idempotent-replayed", b"true")],
+                )
+            return
+
+        response = {"status": 500, "content_type": None, "headers": [], "body": b""}
+
+        async def capturing_send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                for name, value in message.get("headers", []):
+                    if name.lower() == b"content-type":
+                        response["content_type"] = value.decode()
+                    elif name.lower() not in UNSTORED_HEADERS:
+                        response["headers"].append([name.decode("latin-1"), value.decode("latin-1")])
+            elif message["type"] == "http.response.body":
+                response["body"] += message.get("body", b"")
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, capturing_send)
+        except BaseException:
+            await run_in_threadpool(_release, record)
+            raise
+        await run_in_threadpool(
+            _finish, record, response["status"], response["content_type"], response["headers"], response["body"]
+        )
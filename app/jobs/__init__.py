@@ -0,0 +1,7 @@
+"""
+Package initialization file for the background jobs module.
+"""
+
+from .router import router as jobs_router
+
+__all__ = ["jobs_router"]
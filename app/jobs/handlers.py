@@ -0,0 +1,115 @@
+"""
+Background job handlers.
+
+A handler is a function registered under a job kind with @handler. The
+worker (python -m app.worker) calls it with a JobContext and the job's
+payload dict and stores the return value (anything JSON serializable)
+as the job result. Raising an exception fails the attempt; the job is
+retried with backoff until max_attempts is reached.
+
+Enqueue from request handlers or crud with crud.enqueue_job(db, kind, payload).
+"""
+
+import csv
+import os
+
+from .. import crud, models, schemas
+from ..config import JOB_ARTIFACT_DIR
+
+HANDLERS = {}
+
+
+def handler(kind: str):
+    """Register the decorated function as the handler for `kind`."""
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+class JobContext:
+    """What a handler gets besides its payload."""
+
+    def __init__(self, db, job: models.Job):
+        self.db = db
+        self.job = job
+        self.artifact_path = None
+
+    def progress(self, fraction: float, message: str = None):
+        """
+        Report progress (0..1); also keeps the job from being reclaimed.
+        Raises crud.LeaseLost once another worker has taken the job over.
+        """
+        crud.update_job_progress(self.db, self.job.id, self.job.locked_by, fraction, message)
+
+    def artifact(self, filename: str) -> str:
+        """Path to write the job's downloadable result file to."""
+        directory = os.path.join(JOB_ARTIFACT_DIR, str(self.job.id))
+        os.makedirs(directory, exist_ok=True)
+        self.artifact_path = os.path.join(directory, filename)
+        return self.artifact_path
+
+
+# ------------------- Built-in handlers -------------------
+EXPORT_COLUMNS = (
+    "id", "user_id", "council_waiting_list_number", "name", "surname", "id_number", "dob",
+    "residential_address", "contact_numbers", "employer", "department", "employment_number",
+    "status", "created_at",
+)
+EXPORT_PAGE_SIZE = 1000
+
+
+@handler("export_applications")
+def export_applications(ctx: JobContext, payload: dict):
+    """CSV of all applications, optionally limited to one `status`."""
+    A = models.Application
+    query = ctx.db.query(A)
+    if payload.get("status"):
+        query = query.filter(A.status == payload["status"])
+    total = query.count()
+    path = ctx.artifact("applications.csv")
+    written, last_id = 0, 0
+    with open(path, "w", newline="") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(EXPORT_COLUMNS)
+        # keyset pages: progress commits, which would close an open server-side cursor
+        while page := query.filter(A.id > last_id).order_by(A.id).limit(EXPORT_PAGE_SIZE).all():
+            writer.writerows([getattr(app, column) for column in EXPORT_COLUMNS] for app in page)
+            written += len(page)
+            last_id = page[-1].id
+            ctx.progress(written / max(total, written), f"{written} of {total} rows")
+    return {"rows": written}
+
+
+@handler("import_payments")
+def import_payments(ctx: JobContext, payload: dict):
+    """Same as POST /payments/import; payload is a PaymentImport."""
+    data = schemas.PaymentImport.model_validate(payload)
+    result = crud.import_payments(ctx.db, data, actor_user_id=ctx.job.created_by)
+    return result.model_dump()
+
+
+@handler("purge_company_users")
+def purge_company_users(ctx: JobContext, payload: dict):
+    deleted = crud.purge_company_users(ctx.db, payload["company_id"], actor_user_id=ctx.job.created_by)
+    return {"deleted": deleted}
+
+
+@handler("purge_applications")
+def purge_applications(ctx: JobContext, payload: dict):
+    deleted = crud.purge_applications(
+        ctx.db, payload.get("status", "REJECTED"), payload["older_than_days"], actor_user_id=ctx.job.created_by
+    )
+    return {"deleted": deleted}
+
+
+@handler("purge_tombstones")
+def purge_tombstones(ctx: JobContext, payload: dict):
+    """Drop delta-sync deletion records older than SYNC_TOMBSTONE_DAYS."""
+    return {"deleted": crud.purge_tombstones(ctx.db)}
+
+
+@handler("rebuild_waiting_list")
+def rebuild_waiting_list(ctx: JobContext, payload: dict):
+    """Recompute all queue positions, e.g. after rows were changed outside the API."""
+    return {"queued": crud.rebuild_waiting_list(ctx.db)}
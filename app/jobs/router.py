@@ -0,0 +1,68 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from typing import List, Optional
+import os
+
+from .. import crud, schemas
+from ..auth.security import get_current_admin
+from ..deps import get_db
+from .handlers import HANDLERS
+
+router = APIRouter(prefix="/admin/jobs", tags=["admin"])
+
+
+@router.post("", response_model=schemas.JobOut, status_code=status.HTTP_202_ACCEPTED)
+def create_job(
+    job: schemas.JobCreate,
+    db: Session = Depends(get_db),
+    admin=Depends(get_current_admin),
+):
+    """
+    Queue a background job (Admin only). Poll GET /admin/jobs/{id} for
+    progress; the worker process (python -m app.worker) runs it.
+    """
+    if job.kind not in HANDLERS:
+        raise HTTPException(status_code=400, detail=f"Unknown job kind. Available: {', '.join(sorted(HANDLERS))}")
+    return crud.enqueue_job(db, job.kind, job.payload, created_by=admin.id, max_attempts=job.max_attempts)
+
+
+@router.get("", response_model=List[schemas.JobOut])
+def list_jobs(
+    skip: int = 0,
+    limit: int = 100,
+    job_status: Optional[str] = Query(None, alias="status", pattern="^(QUEUED|RUNNING|SUCCEEDED|FAILED)$"),
+    kind: Optional[str] = None,
+    db: Session = Depends(get_db),
+    admin=Depends(get_current_admin),
+):
+    """Most recent jobs first (Admin only)."""
+    return crud.list_jobs(db, skip=skip, limit=limit, status=job_status, kind=kind)
+
+
+@router.get("/{job_id}", response_model=schemas.JobOut)
+def get_job(job_id: int, db: Session = Depends(get_db), admin=Depends(get_current_admin)):
+    job = crud.get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/{job_id}/artifact")
+def download_artifact(job_id: int, db: Session = Depends(get_db), admin=Depends(get_current_admin)):
+    """Download the file a finished job produced, e.g. an export (Admin only)."""
+    job = crud.get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not job.artifact_path or not os.path.exists(job.artifact_path):
+        raise HTTPException(status_code=404, detail="Job has no artifact")
+    return FileResponse(job.artifact_path, filename=os.path.basename(job.artifact_path))
+
+
+@router.post("/{job_id}/retry", response_model=schemas.JobOut, status_code=status.HTTP_202_ACCEPTED)
+def retry_job(job_id: int, db: Session = Depends(get_db), admin=Depends(get_current_admin)):
+    """Queue a FAILED job again (Admin only)."""
+    job = crud.retry_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=409, detail="Only failed jobs can be retried")
+    return job
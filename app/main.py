@@ -1,38 +1,74 @@
 """
 Main application module for FastAPI backend.
+
+Both API versions are built from the same router modules. Heavy optional
+dependencies (passlib/bcrypt, python-jose, httpx) are imported on first
+use so they stay off the serverless cold-start path; see
+benchmarks/bench_import_time.py.
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from .v1.auth.router import router as auth_router
-from .v1.applications.router import router as apps_router
-from .v1.companies.router import router as companies_router
-from .v1.reports.router import router as reports_router
-from .v1.settings.router import router as settings_router
-from .v2.auth.router import router as v2_auth_router
-from .v2.applications.router import router as v2_apps_router
+from .auth.router import router as auth_router
+from .applications.router import build_router as build_applications_router
+from .companies.router import router as companies_router
+from .payments.router import router as payments_router
+from .jobs.router import router as jobs_router
+from .reports.router import router as reports_router
+from .settings.router import router as settings_router
 from .config import CORS_ORIGINS
-from fastapi.staticfiles import StaticFiles
+from .db import dispose_engines
+from .metrics import MetricsMiddleware, flush as flush_metrics, router as metrics_router
+from .sql_timing import SQLTimingMiddleware, router as sql_timing_router
+from .profiling import ProfilingMiddleware, router as profiling_router
+from .idempotency import IdempotencyMiddleware
+from .compression import CompressionMiddleware
+from .read_your_writes import ReadYourWritesMiddleware
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # runs once the server has drained in-flight requests
+    flush_metrics(force=True)
+    dispose_engines()
 
-app = FastAPI(title="Stands Registration API")
 
-# CORS setup
+app = FastAPI(title="Stands Registration API", default_response_class=ORJSONResponse, lifespan=lifespan)
+
+# the last middleware added runs first
+app.add_middleware(IdempotencyMiddleware)
+app.add_middleware(ReadYourWritesMiddleware)  # outside idempotency, so replays do not repeat an old write time
+# CORS setup; outside idempotency so its own 409/422 and replayed responses carry CORS headers too
 app.add_middleware(
     CORSMiddleware,
     allow_origins=CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "Idempotent-Replayed", "ETag", "Last-Modified", "X-Last-Write"],
 )
+app.add_middleware(CompressionMiddleware)  # outside idempotency, so stored responses are uncompressed
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(SQLTimingMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 # Routers
+# reports serves /applications/status, so it must match before /applications/{application_id}
 app.include_router(auth_router, prefix="/api/v1")
-app.include_router(apps_router, prefix="/api/v1")
-app.include_router(companies_router, prefix="/api/v1")
 app.include_router(reports_router, prefix="/api/v1")
+app.include_router(build_applications_router(version=1), prefix="/api/v1")
+app.include_router(companies_router, prefix="/api/v1")
+app.include_router(payments_router, prefix="/api/v1")
 app.include_router(settings_router, prefix="/api/v1")
-app.include_router(v2_auth_router, prefix="/api/v2")
-app.include_router(v2_apps_router, prefix="/api/v2")
+app.include_router(sql_timing_router, prefix="/api/v1")
+app.include_router(profiling_router, prefix="/api/v1")
+app.include_router(jobs_router, prefix="/api/v1")
+app.include_router(auth_router, prefix="/api/v2")
+app.include_router(build_applications_router(version=2), prefix="/api/v2")
+app.include_router(metrics_router)
 
 # app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 
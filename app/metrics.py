@@ -0,0 +1,248 @@
+"""
+Per-route request metrics exposed in Prometheus text format.
+
+MetricsMiddleware records, per route template (e.g.
+/api/v1/applications/{application_id}) and method:
+- http_requests_total by status code
+- http_request_duration_seconds latency histogram
+- http_request_size_bytes / http_response_size_bytes body size histograms
+- http_requests_in_progress gauge
+
+GET /metrics renders them. With METRICS_MULTIPROC_DIR set, each worker
+periodically writes a snapshot to that directory and a scrape on any
+worker merges the snapshots of all workers.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+from fastapi import APIRouter, Response
+
+from .config import METRICS_ENABLED, METRICS_FLUSH_INTERVAL, METRICS_MULTIPROC_DIR
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+HELP = {
+    "http_requests_total": ("counter", "Requests by route template, method and status code."),
+    "http_request_duration_seconds": ("histogram", "Request latency by route template and method."),
+    "http_request_size_bytes": ("histogram", "Request body size by route template and method."),
+    "http_response_size_bytes": ("histogram", "Response body size by route template and method."),
+    "http_requests_in_progress": ("gauge", "Requests currently being served, by method."),
+}
+
+
+class Registry:
+    """Thread-safe in-process store of counters, gauges and histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = defaultdict(float)
+        self.gauges = defaultdict(float)
+        self.histograms = {}
+
+    def inc(self, name: str, labels: tuple, value: float = 1.0):
+        with self._lock:
+            self.counters[(name, labels)] += value
+
+    def gauge_add(self, name: str, labels: tuple, value: float):
+        with self._lock:
+            self.gauges[(name, labels)] += value
+
+    def observe(self, name: str, labels: tuple, value: float, buckets: tuple):
+        with self._lock:
+            hist = self.histograms.get((name, labels))
+            if hist is None:
+                hist = self.histograms[(name, labels)] = {"buckets": buckets, "counts": [0] * len(buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    hist["counts"][i] += 1
+                    break
+            hist["sum"] += value
+            hist["count"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "counters": [[n, list(l), v] for (n, l), v in self.counters.items()],
+                "gauges": [[n, list(l), v] for (n, l), v in self.gauges.items()],
+                "histograms": [[n, list(l), dict(h, counts=list(h["counts"]))] for (n, l), h in self.histograms.items()],
+            }
+
+
+registry = Registry()
+_last_flush = 0.0
+
+
+def _labels(**labels) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+# ---------------- Multi-worker aggregation ----------------
+def flush(force: bool = False):
+    """Write this worker's snapshot to METRICS_MULTIPROC_DIR (atomically)."""
+    global _last_flush
+    if not METRICS_MULTIPROC_DIR:
+        return
+    now = time.monotonic()
+    if not force and now - _last_flush < METRICS_FLUSH_INTERVAL:
+        return
+    _last_flush = now
+    os.makedirs(METRICS_MULTIPROC_DIR, exist_ok=True)
+    path = os.path.join(METRICS_MULTIPROC_DIR, f"{os.getpid()}.json")
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump(registry.snapshot(), fh)
+    os.replace(tmp, path)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def collect() -> list:
+    """Snapshots to render: this worker's, or every worker's in multiprocess mode."""
+    if not METRICS_MULTIPROC_DIR:
+        return [registry.snapshot()]
+    flush(force=True)
+    snapshots = []
+    for name in os.listdir(METRICS_MULTIPROC_DIR):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(METRICS_MULTIPROC_DIR, name)) as fh:
+                snap = json.load(fh)
+        except (OSError, ValueError):
+            continue
+        # counters and histograms of exited workers still count; their in-flight gauges do not
+        if not _pid_alive(snap["pid"]):
+            snap["gauges"] = []
+        snapshots.append(snap)
+    return snapshots
+
+
+# ---------------- Exposition ----------------
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def render(snapshots: list) -> str:
+    """Merge snapshots and render them in the Prometheus text format."""
+    counters, gauges, histograms = defaultdict(float), defaultdict(float), {}
+    for snap in snapshots:
+        for name, labels, value in snap["counters"]:
+            counters[(name, tuple(map(tuple, labels)))] += value
+        for name, labels, value in snap["gauges"]:
+            gauges[(name, tuple(map(tuple, labels)))] += value
+        for name, labels, hist in snap["histograms"]:
+            key = (name, tuple(map(tuple, labels)))
+            merged = histograms.setdefault(key, {"buckets": hist["buckets"], "counts": [0] * len(hist["buckets"]), "sum": 0.0, "count": 0})
+            merged["counts"] = [a + b for a, b in zip(merged["counts"], hist["counts"])]
+            merged["sum"] += hist["sum"]
+            merged["count"] += hist["count"]
+
+    lines = []
+    for metric, (kind, help_text) in HELP.items():
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        if kind == "counter":
+            for (name, labels), value in sorted(counters.items()):
+                if name == metric:
+                    lines.append(f"{metric}{_fmt_labels(labels)} {float(value)!r}")
+        elif kind == "gauge":
+            for (name, labels), value in sorted(gauges.items()):
+                if name == metric:
+                    lines.append(f"{metric}{_fmt_labels(labels)} {float(value)!r}")
+        else:
+            for (name, labels), hist in sorted(histograms.items(), key=lambda item: item[0]):
+                if name != metric:
+                    continue
+                cumulative = 0
+                for bound, count in zip(hist["buckets"], hist["counts"]):
+                    cumulative += count
+                    lines.append(f"{metric}_bucket{_fmt_labels(labels + (('le', f'{bound:g}'),))} {cumulative}")
+                lines.append(f"{metric}_bucket{_fmt_labels(labels + (('le', '+Inf'),))} {hist['count']}")
+                lines.append(f"{metric}_sum{_fmt_labels(labels)} {float(hist['sum'])!r}")
+                lines.append(f"{metric}_count{_fmt_labels(labels)} {hist['count']}")
+    return "\n".join(lines) + "\n"
+
+
+# ---------------- Middleware ----------------
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware, so streaming responses are not buffered.
+    The route template is read from scope["route"], which FastAPI sets
+    once a route has matched.
+    """
+
+    def __init__(self, app, skip_paths=("/metrics",)):
+        self.app = app
+        self.skip_paths = set(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        in_progress = _labels(method=method)
+        state = {"status": 500, "request_bytes": 0, "response_bytes": 0}
+
+        async def counting_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                state["request_bytes"] += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                state["response_bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        registry.gauge_add("http_requests_in_progress", in_progress, 1)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            elapsed = time.perf_counter() - start
+            registry.gauge_add("http_requests_in_progress", in_progress, -1)
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "<unmatched>"
+            labels = _labels(route=template, method=method)
+            registry.inc("http_requests_total", _labels(route=template, method=method, status=str(state["status"])))
+            registry.observe("http_request_duration_seconds", labels, elapsed, LATENCY_BUCKETS)
+            registry.observe("http_request_size_bytes", labels, state["request_bytes"], SIZE_BUCKETS)
+            registry.observe("http_response_size_bytes", labels, state["response_bytes"], SIZE_BUCKETS)
+            flush()
+
+
+if METRICS_MULTIPROC_DIR:
+    atexit.register(flush, force=True)
+
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint."""
+    return Response(render(collect()), media_type="text/plain; version=0.0.4; charset=utf-8")
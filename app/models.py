@@ -1,8 +1,12 @@
 """
 SQLAlchemy models for database tables.
 """
-from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Text, Enum,Float
-from sqlalchemy.orm import relationship
+import re
+from datetime import datetime, timezone
+from itertools import chain
+from sqlalchemy import BigInteger, Column, Integer, String, Date, DateTime, ForeignKey, Text, Enum,Float, Index, LargeBinary, UniqueConstraint, select
+from sqlalchemy import event, tuple_, update
+from sqlalchemy.orm import Session, aliased, backref, column_property, relationship, validates
 from sqlalchemy.sql import func
 from .db import Base
 
@@ -30,11 +34,31 @@ class User(Base):
 
     company = relationship("Company", backref="users")
 
+def utcnow() -> datetime:
+    """
+    Application-side timestamp for updated_at: microsecond precision on
+    every backend, and on the same clock as delta sync's settle window.
+    """
+    return datetime.now(timezone.utc)
+
+
+def parse_waiting_list_number(value):
+    """First run of digits in a council waiting-list number, e.g. "HR/004512" -> 4512."""
+    match = re.search(r"\d{1,18}", value or "")
+    return int(match.group()) if match else None
+
+
 class Application(Base):
     __tablename__ = "applications"
+    # serves count/max(updated_at) of a user's applications for list ETags
+    __table_args__ = (
+        Index("ix_applications_user_id_updated_at", "user_id", "updated_at"),
+        Index("ix_applications_updated_at_id", "updated_at", "id"),  # delta-sync cursor
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     council_waiting_list_number = Column(String(100), nullable=True)
+    waiting_list_key = Column(BigInteger, nullable=True, index=True)  # numeric part of the number, for ordering
     name = Column(String(100))
     surname = Column(String(100))
     id_number = Column(String(100))
@@ -47,13 +71,24 @@ class Application(Base):
     employer_contact=Column(String(200),nullable=True)
     status = Column(String(50), default="PENDING")  # PENDING, APPROVED, REJECTED
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=utcnow, onupdate=utcnow, server_default=func.now())
+    version = Column(Integer, nullable=False, server_default="1")  # bumped on every update
 
-    user = relationship("User", backref="applications")
-    next_of_kin = relationship("NextOfKin", back_populates="application", uselist=False, cascade="all, delete-orphan")
-    spouse = relationship("Spouse", uselist=False, back_populates="application", cascade="all, delete-orphan")
-    beneficiaries = relationship("Beneficiary", back_populates="application", cascade="all, delete-orphan")
-    documents = relationship("Document", back_populates="application", cascade="all, delete-orphan")
-    payments = relationship("Payment", back_populates="application", cascade="all, delete-orphan")
+    __mapper_args__ = {"version_id_col": version}
+
+    @validates("council_waiting_list_number")
+    def _set_waiting_list_key(self, key, value):
+        self.waiting_list_key = parse_waiting_list_number(value)
+        return value
+
+    # passive_deletes: the ON DELETE CASCADE foreign keys remove child rows,
+    # so deleting an application or user does not load its children first
+    user = relationship("User", backref=backref("applications", cascade="all, delete-orphan", passive_deletes=True))
+    next_of_kin = relationship("NextOfKin", back_populates="application", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
+    spouse = relationship("Spouse", uselist=False, back_populates="application", cascade="all, delete-orphan", passive_deletes=True)
+    beneficiaries = relationship("Beneficiary", back_populates="application", cascade="all, delete-orphan", passive_deletes=True)
+    documents = relationship("Document", back_populates="application", cascade="all, delete-orphan", passive_deletes=True)
+    payments = relationship("Payment", back_populates="application", cascade="all, delete-orphan", passive_deletes=True)
 
 
 
@@ -101,15 +136,30 @@ class Beneficiary(Base):
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (Index("ix_documents_application_id_updated_at", "application_id", "updated_at"),)
     id = Column(Integer, primary_key=True, index=True)
     application_id = Column(Integer, ForeignKey("applications.id", ondelete="CASCADE"))
 
     kind = Column(String(50))  # ID_SCAN, PROOF_OF_RESIDENCE, PAYSLIP, SIGNATURE
     path = Column(String(500))  # file system path or cloud URL
+    size = Column(BigInteger, nullable=True)  # bytes; NULL for documents uploaded before it was recorded
+    content_type = Column(String(255), nullable=True)
+    checksum = Column(String(64), nullable=True)  # sha256, hex
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=utcnow, onupdate=utcnow, server_default=func.now())
 
     application = relationship("Application", back_populates="documents")
 
 
+class DeletedRecord(Base):
+    """Tombstone of a deleted application, served to delta-sync clients."""
+    __tablename__ = "deleted_records"
+    id = Column(Integer, primary_key=True, index=True)
+    record_type = Column(String(50), nullable=False)  # "application"
+    record_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now(), index=True)
+
+
 class Payment(Base):
     __tablename__ = "payments"
     id = Column(Integer, primary_key=True, index=True)
@@ -140,3 +190,107 @@ class Setting(Base):
     id = Column(Integer, primary_key=True, index=True)
     key = Column(String(100), unique=True)
     value = Column(Text)
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_key"),)
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    key = Column(String(255), nullable=False)
+    method = Column(String(10))
+    path = Column(String(500))
+    request_hash = Column(String(64))  # sha256 of method, path and body
+    status = Column(String(20), default="IN_PROGRESS")  # IN_PROGRESS or COMPLETED
+    response_status = Column(Integer, nullable=True)
+    response_content_type = Column(String(255), nullable=True)
+    response_headers = Column(Text, nullable=True)  # JSON [[name, value], ...], replayed with the body
+    response_body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    locked_at = Column(DateTime(timezone=True))
+    expires_at = Column(DateTime(timezone=True), index=True)
+
+
+
+class WaitingListPosition(Base):
+    """
+    Queue of PENDING applications with their sort key. A position is the
+    number of entries ahead, an index-only count, so entering or leaving
+    the queue never rewrites other rows. Kept up to date by
+    crud.waiting_list_enter/leave, rebuilt by rebuild_waiting_list;
+    deleted applications drop out through ON DELETE CASCADE.
+    """
+    __tablename__ = "waiting_list_positions"
+    __table_args__ = (Index("ix_waiting_list_positions_order", "sort_key", "created_at", "application_id"),)
+    application_id = Column(Integer, ForeignKey("applications.id", ondelete="CASCADE"), primary_key=True)
+    sort_key = Column(BigInteger, nullable=False)  # waiting_list_key, missing numbers last
+    created_at = Column(DateTime(timezone=True), nullable=False)  # the application's, copied for the index
+
+
+CHILD_MODELS = (NextOfKin, Spouse, Beneficiary, Document, Payment)
+
+
+@event.listens_for(Session, "after_flush")
+def _touch_parent_applications(session, flush_context):
+    """
+    Bump applications.updated_at when one of their child rows changes, so
+    conditional GETs and delta sync see the change on the parent.
+    """
+    ids = {
+        obj.application_id
+        for obj in chain(session.new, session.dirty, session.deleted)
+        if isinstance(obj, CHILD_MODELS) and obj.application_id is not None
+    }
+    if ids:
+        session.connection().execute(
+            update(Application).where(Application.id.in_(ids)).values(updated_at=utcnow())
+        )
+
+
+def _queue_order(entry):
+    return tuple_(entry.sort_key, entry.created_at, entry.application_id)
+
+
+_own_entry, _ahead = aliased(WaitingListPosition), aliased(WaitingListPosition)
+# deferred: only loaded when a query asks for it with undefer(); NULL when not queued
+Application.queue_position = column_property(
+    select(
+        select(func.count())
+        .select_from(_ahead)
+        .where(_queue_order(_ahead) < _queue_order(_own_entry))
+        .correlate(_own_entry)
+        .scalar_subquery()
+        + 1
+    )
+    .where(_own_entry.application_id == Application.id)
+    .correlate_except(_own_entry)
+    .scalar_subquery(),
+    deferred=True,
+)
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (Index("ix_jobs_status_run_at", "status", "run_at"),)
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(100), nullable=False)  # handler name, see app/jobs/handlers.py
+    payload = Column(Text)  # JSON
+    status = Column(String(20), default="QUEUED")  # QUEUED, RUNNING, SUCCEEDED, FAILED
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    run_at = Column(DateTime(timezone=True), server_default=func.now())  # not claimed before this
+    locked_at = Column(DateTime(timezone=True), nullable=True)  # refreshed by progress updates
+    locked_by = Column(String(100), nullable=True)
+    progress = Column(Float, default=0.0)  # 0..1
+    progress_message = Column(String(255), nullable=True)
+    result = Column(Text, nullable=True)  # JSON
+    artifact_path = Column(String(500), nullable=True)
+    error = Column(Text, nullable=True)
+    created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    @property
+    def has_artifact(self) -> bool:
+        return bool(self.artifact_path)
@@ -0,0 +1,7 @@
+"""
+Package initialization file for payments module.
+"""
+
+from .router import router as payments_router
+
+__all__ = ["payments_router"]
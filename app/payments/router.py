@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from .. import crud, schemas
+from ..auth.security import get_current_admin
+from ..deps import get_db
+
+router = APIRouter(prefix="/payments", tags=["payments"])
+
+
+@router.post("/import", response_model=schemas.PaymentImportResult)
+def import_payments(
+    data: schemas.PaymentImport,
+    db: Session = Depends(get_db),
+    admin=Depends(get_current_admin),
+):
+    """
+    Record a bank batch of receipts in one request (Admin only).
+    Each receipt is matched to an application by application_id,
+    council_waiting_list_number or id_number. Receipts that are already
+    recorded are reported as duplicates (same values) or conflicts, or
+    overwritten with on_conflict=update.
+    """
+    return crud.import_payments(db, data, actor_user_id=admin.id)
@@ -0,0 +1,223 @@
+"""
+On-demand request profiling.
+
+An authenticated admin can ask for any request to be profiled by sending
+`X-Profile: 1` (or `?profile=1`). Optionally a random PROFILE_SAMPLE_RATE
+fraction of all requests is profiled as well. Profiles are taken by a
+sampling profiler (a background thread reading sys._current_frames()
+every PROFILE_INTERVAL_MS), so sync endpoints running in the threadpool
+are covered too. Samples from all busy threads of the worker are
+recorded, so concurrent requests on the same worker can show up.
+
+Finished profiles go to an in-memory ring buffer and the response carries
+an `X-Profile-Id` header. Admins fetch them from /admin/profiles in the
+folded-stack format read by flamegraph.pl, speedscope and inferno.
+PROFILE_MAX_PER_MINUTE caps how many profiles a worker takes.
+"""
+
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from urllib.parse import parse_qs
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from starlette.concurrency import run_in_threadpool
+from typing import List
+
+from . import schemas
+from .auth.security import get_current_admin, get_current_user
+from .config import (
+    PROFILING_ENABLED,
+    PROFILE_BUFFER_SIZE,
+    PROFILE_INTERVAL_MS,
+    PROFILE_MAX_PER_MINUTE,
+    PROFILE_SAMPLE_RATE,
+)
+from .db import SessionLocal
+
+# Leaf frames in these files mean the thread is parked, not working.
+_IDLE_FILES = tuple(
+    os.path.join(os.path.dirname(os.__file__), name)
+    for name in ("threading.py", "queue.py", "selectors.py")
+)
+
+
+class SamplingProfiler:
+    """Collects folded stacks of every busy thread until stopped."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own or frame.f_code.co_filename.startswith(_IDLE_FILES):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.samples[";".join(reversed(stack))] += 1
+
+
+class ProfileStore:
+    """Ring buffer of finished profiles plus the global rate limit."""
+
+    def __init__(self, size: int, max_per_minute: int):
+        self._lock = threading.Lock()
+        self._profiles = deque(maxlen=size)
+        self._started = deque()
+        self._ids = itertools.count(1)
+        self.max_per_minute = max_per_minute
+
+    def acquire(self) -> bool:
+        """Reserve a profiling slot; False when the per-minute limit is used up."""
+        now = time.monotonic()
+        with self._lock:
+            while self._started and now - self._started[0] > 60:
+                self._started.popleft()
+            if len(self._started) >= self.max_per_minute:
+                return False
+            self._started.append(now)
+            return True
+
+    def add(self, profile: dict) -> int:
+        with self._lock:
+            profile["id"] = next(self._ids)
+            self._profiles.append(profile)
+            return profile["id"]
+
+    def list(self):
+        with self._lock:
+            return list(reversed(self._profiles))
+
+    def get(self, profile_id: int):
+        with self._lock:
+            return next((p for p in self._profiles if p["id"] == profile_id), None)
+
+
+store = ProfileStore(PROFILE_BUFFER_SIZE, PROFILE_MAX_PER_MINUTE)
+
+
+def _is_admin(scope) -> bool:
+    """Run the get_current_user/get_current_admin dependencies by hand."""
+    headers = dict(scope["headers"])
+    scheme, _, token = headers.get(b"authorization", b"").decode().partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    db = SessionLocal()
+    try:
+        get_current_admin(get_current_user(token, db))
+        return True
+    except HTTPException:
+        return False
+    finally:
+        db.close()
+
+
+def _requested(scope) -> bool:
+    if dict(scope["headers"]).get(b"x-profile") in (b"1", b"true"):
+        return True
+    query = parse_qs(scope.get("query_string", b"").decode())
+    return query.get("profile", [""])[0] in ("1", "true")
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware wrapping selected requests in the sampling profiler."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not PROFILING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        if _requested(scope):
+            trigger = "admin"
+            wanted = await run_in_threadpool(_is_admin, scope)
+        else:
+            trigger = "sample"
+            wanted = PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+        if not wanted or not store.acquire():
+            await self.app(scope, receive, send)
+            return
+
+        profiler = SamplingProfiler(PROFILE_INTERVAL_MS / 1000)
+        # stored up front so the id can go out in the response headers
+        profile = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": None,
+            "trigger": trigger,
+            "status": None,
+            "duration_ms": None,
+            "created_at": datetime.now(timezone.utc),
+            "samples": Counter(),
+        }
+        profile_id = store.add(profile)
+        status = {"code": 500}
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                if trigger == "admin":
+                    message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", str(profile_id).encode())]
+            await send(message)
+
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profiler.stop()
+            profile.update(
+                duration_ms=round((time.perf_counter() - start) * 1000, 2),
+                status=status["code"],
+                route=getattr(scope.get("route"), "path", None),
+                samples=profiler.samples,
+            )
+
+
+# ------------------- Admin Endpoints -------------------
+router = APIRouter(prefix="/admin/profiles", tags=["admin"])
+
+
+def _summary(profile):
+    return dict(profile, samples=sum(profile["samples"].values()))
+
+
+@router.get("", response_model=List[schemas.ProfileSummary])
+def list_profiles(admin=Depends(get_current_admin)):
+    """Profiles currently held in this worker's ring buffer, newest first (Admin only)."""
+    return [_summary(p) for p in store.list()]
+
+
+@router.get("/{profile_id}")
+def get_profile(profile_id: int, admin=Depends(get_current_admin)):
+    """
+    One profile in folded-stack format ("frame;frame;frame count" per
+    line), ready for flamegraph.pl or speedscope (Admin only).
+    """
+    profile = store.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    body = "".join(f"{stack} {count}\n" for stack, count in profile["samples"].most_common())
+    return Response(body, media_type="text/plain; charset=utf-8")
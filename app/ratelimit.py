@@ -0,0 +1,134 @@
+"""
+Token-bucket rate limiting for expensive endpoints.
+
+RateLimit is a route dependency holding one bucket per client IP and,
+optionally, one per submitted email address. A bucket of "10/minute"
+holds up to 10 tokens and refills at 10 per minute; each request takes
+one. When a bucket is empty the request fails with 429 and a Retry-After
+header before the endpoint (and its bcrypt work) runs.
+
+Buckets live in a BucketStore. MemoryBucketStore keeps them in-process
+with least-recently-used eviction, so limits are per worker. To share
+limits between workers or hosts, implement BucketStore.take() on top of
+a shared backend (e.g. a Redis script) and pass it to set_store().
+
+The client IP is request.client.host; run uvicorn with --proxy-headers
+behind a trusted proxy so that it is the real client address.
+"""
+
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Request
+
+from .config import RATE_LIMIT_ENABLED, RATE_LIMIT_MAX_KEYS
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+
+
+def parse_rate(rate: Optional[str]) -> Optional[Tuple[int, float]]:
+    """Parse "10/minute" into (capacity, tokens per second); None if empty."""
+    if not rate:
+        return None
+    count, _, period = rate.partition("/")
+    if period not in PERIODS or int(count) < 1:
+        raise ValueError(f"Invalid rate limit {rate!r}, expected e.g. '10/minute'")
+    return int(count), int(count) / PERIODS[period]
+
+
+class BucketStore(ABC):
+    """Interface for token bucket storage."""
+
+    @abstractmethod
+    def take(self, key: str, capacity: int, refill_per_sec: float) -> float:
+        """
+        Take one token from bucket `key`. Return 0 when the request is
+        allowed, otherwise the seconds until a token is available.
+        """
+
+
+class MemoryBucketStore(BucketStore):
+    """In-process buckets, bounded to `max_keys` with LRU eviction."""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: int, refill_per_sec: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_per_sec)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return 0.0 if allowed else (1 - tokens) / refill_per_sec
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+store: BucketStore = MemoryBucketStore()
+
+
+def set_store(new_store: BucketStore):
+    """Replace the bucket store used by every RateLimit, e.g. with a shared one."""
+    global store
+    store = new_store
+
+
+async def _submitted_email(request: Request) -> Optional[str]:
+    """The email in a login form (username) or a JSON body (email)."""
+    content_type = request.headers.get("content-type", "")
+    try:
+        if content_type.startswith(("application/x-www-form-urlencoded", "multipart/form-data")):
+            value = (await request.form()).get("username")
+        elif content_type.startswith("application/json"):
+            body = await request.json()
+            value = body.get("email") if isinstance(body, dict) else None
+        else:
+            return None
+    except ValueError:
+        return None
+    return value.strip().lower() if isinstance(value, str) and value.strip() else None
+
+
+class RateLimit:
+    """
+    Dependency enforcing per-IP and per-email token buckets for one route:
+
+        @router.post("/token", dependencies=[Depends(RateLimit("token", per_ip="30/minute"))])
+    """
+
+    def __init__(self, name: str, per_ip: Optional[str] = None, per_email: Optional[str] = None):
+        self.name = name
+        self.per_ip = parse_rate(per_ip)
+        self.per_email = parse_rate(per_email)
+
+    def _check(self, key: str, rate: Tuple[int, float]):
+        retry_after = store.take(f"{self.name}:{key}", *rate)
+        if retry_after > 0:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, please try again later",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+    async def __call__(self, request: Request):
+        if not RATE_LIMIT_ENABLED:
+            return
+        if self.per_ip:
+            self._check(f"ip:{request.client.host if request.client else 'unknown'}", self.per_ip)
+        if self.per_email:
+            email = await _submitted_email(request)
+            if email:
+                self._check(f"email:{email}", self.per_email)
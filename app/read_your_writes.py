@@ -0,0 +1,62 @@
+"""
+Read-your-writes across workers and instances.
+
+Reads may go to a replica (see deps.get_read_db), which can lag behind the
+primary. After a request commits a write, ReadYourWritesMiddleware sends
+the write time back to the client, both as the `last_write` cookie and
+as an X-Last-Write header for clients that do not keep cookies. While a
+request carries a write time from the last READ_YOUR_WRITES_SECONDS, its
+reads stay on the primary. The client holds this state, so it works
+whichever worker or instance serves the next request.
+
+The value is only a routing hint: a forged one at most sends that
+client's reads to the primary for the length of the window.
+"""
+
+import math
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+
+from .config import READ_YOUR_WRITES_SECONDS
+
+COOKIE_NAME = "last_write"
+HEADER_NAME = "X-Last-Write"
+
+
+def wrote_recently(request: Request) -> bool:
+    value = request.headers.get(HEADER_NAME) or request.cookies.get(COOKIE_NAME)
+    try:
+        written_at = float(value)
+    except (TypeError, ValueError):
+        return False
+    # abs(): clocks of different instances may be slightly apart
+    return abs(time.time() - written_at) < READ_YOUR_WRITES_SECONDS
+
+
+class ReadYourWritesMiddleware:
+    """Pure ASGI middleware; adds the cookie and header after a committed write."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        # shared with request.state, where app.db records the commit
+        state = scope.setdefault("state", {})
+
+        async def send_with_write_time(message):
+            if message["type"] == "http.response.start" and "last_write" in state:
+                value = f"{state['last_write']:.3f}"
+                headers = MutableHeaders(scope=message)
+                headers.append(HEADER_NAME, value)
+                headers.append(
+                    "Set-Cookie",
+                    f"{COOKIE_NAME}={value}; Max-Age={math.ceil(READ_YOUR_WRITES_SECONDS)}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_write_time)
@@ -2,9 +2,9 @@
 Pydantic schemas for data validation.
 """
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, SerializeAsAny, field_validator, model_validator
 from datetime import date, datetime
-from typing import Optional, List
+from typing import Dict, Literal, Optional, List
 
 
 # ---------- Company ----------
@@ -31,8 +31,19 @@ class CompanyOut(CompanyBase):
     id: int
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class CompanyStats(BaseModel):
+    company_id: int
+    company_name: str
+    applicants: int
+    applications: int
+    applications_by_status: Dict[str, int]
+    complete_documents: int                         # applications with every required document kind
+    document_completeness: Optional[float] = None   # complete_documents / applications
+    payments_count: int
+    payments_total: float
 
 
 # ---------- User ----------
@@ -50,8 +61,7 @@ class UserOut(UserBase):
     role: str
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ---------- Application ----------
@@ -78,9 +88,64 @@ class ApplicationOut(ApplicationBase):
     id: int
     status: str
     created_at: datetime
+    version: int  # send back as expected version when changing status
+
+    model_config = ConfigDict(from_attributes=True)
+
 
-    class Config:
-        orm_mode = True
+class ApplicationWithPosition(ApplicationOut):
+    queue_position: Optional[int] = None  # None once the application has left the queue
+
+class QueuePosition(BaseModel):
+    application_id: int
+    status: str
+    council_waiting_list_number: Optional[str] = None
+    position: Optional[int] = None
+    queue_length: int
+
+
+class StatusUpdate(BaseModel):
+    status: str  # APPROVED, REJECTED or PENDING
+    version: Optional[int] = None  # the version you reviewed; 409 if it changed since
+
+
+class BulkStatusFilter(BaseModel):
+    status: Optional[str] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+
+    @model_validator(mode="after")
+    def has_criterion(self):
+        # an empty filter would match every application
+        if self.status is None and self.created_after is None and self.created_before is None:
+            raise ValueError("filter needs at least one of status, created_after, created_before")
+        return self
+
+class BulkStatusUpdate(BaseModel):
+    status: str
+    ids: Optional[List[int]] = Field(None, min_length=1)
+    filter: Optional[BulkStatusFilter] = None
+
+    @model_validator(mode="after")
+    def ids_or_filter(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Provide either ids or filter, not both")
+        return self
+
+class BulkStatusResult(BaseModel):
+    status: str
+    updated_ids: List[int]
+
+
+class PurgeResult(BaseModel):
+    deleted: int
+
+
+class ApplicationChanges(BaseModel):
+    applications: List[SerializeAsAny[ApplicationOut]]  # ApplicationSyncOut with include_children
+    deleted: List[int] = []             # ids of applications deleted since the cursor
+    cursor: str                         # pass back as ?cursor= on the next call
+    has_more: bool = False              # call again right away with the new cursor
 
 
 # ---------- NextOfKin ----------
@@ -90,27 +155,26 @@ class NextOfKinBase(BaseModel):
     id_number: str
     dob: date
     relation: str
-    profession: Optional[str]
-    address: Optional[str]
-    cell: Optional[str]
+    profession: Optional[str] = None
+    address: Optional[str] = None
+    cell: Optional[str] = None
 
 class NextOfKinCreate(NextOfKinBase):
     pass
 
 class NextOfKinUpdate(BaseModel):
-    name: Optional[str]
-    surname: Optional[str]
-    id_number: Optional[str]
-    dob: Optional[date]
-    relation: Optional[str]
-    profession: Optional[str]
-    address: Optional[str]
-    cell: Optional[str]
+    name: Optional[str] = None
+    surname: Optional[str] = None
+    id_number: Optional[str] = None
+    dob: Optional[date] = None
+    relation: Optional[str] = None
+    profession: Optional[str] = None
+    address: Optional[str] = None
+    cell: Optional[str] = None
 
 class NextOfKinOut(NextOfKinBase):
     id: int
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ---------- Spouse ----------
@@ -124,15 +188,14 @@ class SpouseCreate(SpouseBase):
     pass
 
 class SpouseUpdate(BaseModel):
-    name: Optional[str]
-    surname: Optional[str]
-    id_number: Optional[str]
-    dob: Optional[date]
+    name: Optional[str] = None
+    surname: Optional[str] = None
+    id_number: Optional[str] = None
+    dob: Optional[date] = None
 
 class SpouseOut(SpouseBase):
     id: int
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ---------- Beneficiary ----------
@@ -145,14 +208,13 @@ class BeneficiaryCreate(BeneficiaryBase):
     pass
 
 class BeneficiaryUpdate(BaseModel):
-    name: Optional[str]
-    dob: Optional[date]
-    id_number: Optional[str]
+    name: Optional[str] = None
+    dob: Optional[date] = None
+    id_number: Optional[str] = None
 
 class BeneficiaryOut(BeneficiaryBase):
     id: int
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ---------- Document ----------
@@ -164,54 +226,126 @@ class DocumentCreate(DocumentBase):
     pass
 
 class DocumentUpdate(BaseModel):
-    kind: Optional[str]
-    path: Optional[str]
+    kind: Optional[str] = None
+    path: Optional[str] = None
 
 class DocumentOut(DocumentBase):
     id: int
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ---------- Payment ----------
 class PaymentBase(BaseModel):
     amount: float
     currency: Optional[str] = "USD"
-    description: Optional[str]
+    description: Optional[str] = None
     receipt_number: str
 
 class PaymentCreate(PaymentBase):
     pass
 
 class PaymentUpdate(BaseModel):
-    amount: Optional[float]
-    currency: Optional[str]
-    description: Optional[str]
-    receipt_number: Optional[str]
+    amount: Optional[float] = None
+    currency: Optional[str] = None
+    description: Optional[str] = None
+    receipt_number: Optional[str] = None
 
 class PaymentOut(PaymentBase):
     id: int
     created_at: datetime
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PaymentImportRow(PaymentBase):
+    """One bank receipt; matched by application_id, waiting-list number or ID number."""
+    application_id: Optional[int] = None
+    council_waiting_list_number: Optional[str] = None
+    id_number: Optional[str] = None
+
+    @model_validator(mode="after")
+    def has_match_key(self):
+        if not (self.application_id or self.council_waiting_list_number or self.id_number):
+            raise ValueError("Provide application_id, council_waiting_list_number or id_number")
+        return self
+
+class PaymentImport(BaseModel):
+    payments: List[PaymentImportRow] = Field(..., max_length=5000)
+    on_conflict: Literal["ignore", "update"] = "ignore"
+
+class PaymentImportResult(BaseModel):
+    inserted: List[str] = []      # receipt numbers
+    updated: List[str] = []       # existing receipts overwritten (on_conflict=update)
+    duplicates: List[str] = []    # already recorded with the same values, or repeated in the batch
+    conflicts: List[str] = []     # already recorded with different values (on_conflict=ignore)
+    unmatched: List[str] = []     # no single application matched
+
+
+# ---------- Full application submission ----------
+class ApplicationSubmit(ApplicationCreate):
+    next_of_kin: Optional[NextOfKinCreate] = None
+    spouse: Optional[SpouseCreate] = None
+    beneficiaries: List[BeneficiaryCreate] = []
+    payments: List[PaymentCreate] = []
+
+    @field_validator("payments")
+    @classmethod
+    def unique_receipts(cls, payments):
+        receipts = [p.receipt_number for p in payments]
+        if len(receipts) != len(set(receipts)):
+            raise ValueError("Duplicate receipt_number in payments")
+        return payments
+
+class ApplicationFullOut(ApplicationOut):
+    next_of_kin: Optional[NextOfKinOut] = None
+    spouse: Optional[SpouseOut] = None
+    beneficiaries: List[BeneficiaryOut] = []
+    payments: List[PaymentOut] = []
+
+class ApplicationSyncOut(ApplicationFullOut):
+    documents: List[DocumentOut] = []
 
 
 # ---------- AuditLog ----------
 class AuditLogBase(BaseModel):
     action: str
-    target_id: Optional[int]
-    meta: Optional[str]
+    target_id: Optional[int] = None
+    meta: Optional[str] = None
 
 class AuditLogOut(BaseModel):
     id: int
-    actor_user_id: int
+    actor_user_id: Optional[int] = None  # NULL once the actor's account is deleted, or for system changes
     action: str
     target_id: Optional[int] = None
     meta: Optional[str] = None
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+# ------------------- Jobs -------------------
+class JobCreate(BaseModel):
+    kind: str
+    payload: dict = {}
+    max_attempts: int = Field(3, ge=1, le=10)
+
+class JobOut(BaseModel):
+    id: int
+    kind: str
+    status: str
+    attempts: int
+    max_attempts: int
+    progress: float
+    progress_message: Optional[str] = None
+    result: Optional[str] = None  # JSON
+    error: Optional[str] = None
+    has_artifact: bool = False
+    created_by: Optional[int] = None
+    created_at: Optional[datetime] = None
+    run_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ------------------- Document -------------------
@@ -227,14 +361,40 @@ class DocumentOut(DocumentBase):
     id: int
     application_id: int
     path: str
+    size: Optional[int] = None
+    content_type: Optional[str] = None
+    checksum: Optional[str] = None  # sha256
+    created_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SQLInstrumentationSettings(BaseModel):
+    enabled: bool
+    slow_ms: float
+    repeat_threshold: int
 
-    class Config:
-        orm_mode = True
+
+class SQLInstrumentationUpdate(BaseModel):
+    enabled: Optional[bool] = None
+    slow_ms: Optional[float] = None
+    repeat_threshold: Optional[int] = None
+
+
+class ProfileSummary(BaseModel):
+    id: int
+    method: str
+    path: str
+    route: Optional[str] = None
+    trigger: str
+    status: Optional[int] = None
+    duration_ms: Optional[float] = None
+    created_at: datetime
+    samples: int
 
 
 class UserUpdate(BaseModel):
-    full_name: Optional[str]
-    role: Optional[str]
+    full_name: Optional[str] = None
+    role: Optional[str] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
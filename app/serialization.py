@@ -0,0 +1,63 @@
+"""
+Fast JSON serialization helpers for list responses.
+"""
+
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple, Type
+
+from fastapi import HTTPException, Response
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    """Return the cached TypeAdapter for List[model]."""
+    return TypeAdapter(List[model])
+
+
+@lru_cache(maxsize=256)
+def partial_model(model: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """Return a cached copy of `model` restricted to `fields`."""
+    return create_model(
+        f"{model.__name__}Partial",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (model.model_fields[name].annotation, model.model_fields[name]) for name in fields},
+    )
+
+
+def parse_fields(model: Type[BaseModel], fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Parse a comma separated `fields=` query value against the fields of
+    `model`. Returns None when no projection was requested.
+    """
+    if not fields:
+        return None
+    requested = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in model.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return requested or None
+
+
+def dump_list(model: Type[BaseModel], items: Iterable) -> bytes:
+    """
+    Validate ORM objects and encode them to JSON bytes in a single
+    pass through pydantic-core, without building per-item models first.
+    """
+    adapter = list_adapter(model)
+    return adapter.dump_json(adapter.validate_python(list(items), from_attributes=True))
+
+
+def list_response(
+    model: Type[BaseModel],
+    items: Iterable,
+    fields: Optional[Tuple[str, ...]] = None,
+    headers: Optional[dict] = None,
+) -> Response:
+    """
+    Build a JSON response for a list of ORM objects, optionally limited
+    to the given sparse fieldset.
+    """
+    if fields:
+        model = partial_model(model, fields)
+    return Response(content=dump_list(model, items), media_type="application/json", headers=headers)
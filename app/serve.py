@@ -0,0 +1,109 @@
+"""
+Production web server for running the API on our own machines (Vercel
+imports app.main directly and does not use this):
+
+    python -m app.serve [--workers 4] [--host 0.0.0.0] [--port 8000]
+
+- Workers: WEB_WORKERS, or one per CPU core this process may run on.
+- Database pool: with DB_CONNECTION_BUDGET set (and DB_POOL_SIZE /
+  DB_MAX_OVERFLOW unset), each worker gets an equal share of the budget
+  as a fixed pool, so all workers together stay within it. Replicas get
+  the same per-worker sizing. Workers are spawned, not forked; app.db
+  also drops inherited pools in forked children for other servers.
+- uvloop and httptools are used when installed (uvicorn[standard]);
+  --loop / --http pick explicitly.
+- SIGTERM/SIGINT: stop accepting connections, end open event streams so
+  clients reconnect to another instance, give in-flight requests up to
+  GRACEFUL_TIMEOUT seconds, then flush metrics and close pools.
+"""
+
+import argparse
+import importlib.util
+import logging
+import os
+
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+from .config import DB_CONNECTION_BUDGET, GRACEFUL_TIMEOUT, WEB_WORKERS
+
+logger = logging.getLogger("app.serve")
+
+
+def available_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))  # honours CPU pinning and cpusets
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def pool_share(budget: int, workers: int) -> int:
+    """Connections each worker may hold when `workers` share `budget`."""
+    share = budget // workers
+    if share < 1:
+        raise SystemExit(f"DB_CONNECTION_BUDGET={budget} is less than one connection per worker ({workers} workers)")
+    return share
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+class GracefulServer(uvicorn.Server):
+    """Closes server-sent event streams as soon as shutdown starts."""
+
+    def handle_exit(self, sig, frame):
+        super().handle_exit(sig, frame)
+        # open streams would otherwise hold the shutdown for GRACEFUL_TIMEOUT
+        from .events import broker
+
+        broker.close_all()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the API with multiple workers")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=WEB_WORKERS or available_cores())
+    parser.add_argument("--loop", choices=("auto", "asyncio", "uvloop"), default="auto")
+    parser.add_argument("--http", choices=("auto", "h11", "httptools"), default="auto")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
+    if DB_CONNECTION_BUDGET and "DB_POOL_SIZE" not in os.environ and "DB_MAX_OVERFLOW" not in os.environ:
+        # read by app.config in every spawned worker
+        os.environ["DB_POOL_SIZE"] = str(pool_share(DB_CONNECTION_BUDGET, args.workers))
+        os.environ["DB_MAX_OVERFLOW"] = "0"
+
+    loop = args.loop
+    if loop == "auto":
+        loop = "uvloop" if _installed("uvloop") else "asyncio"
+    http = args.http
+    if http == "auto":
+        http = "httptools" if _installed("httptools") else "h11"
+    logger.info(
+        "starting %d workers on %s:%d (loop=%s, http=%s, db pool=%s+%s per worker)",
+        args.workers, args.host, args.port, loop, http,
+        os.getenv("DB_POOL_SIZE", "default"), os.getenv("DB_MAX_OVERFLOW", "default"),
+    )
+
+    config = uvicorn.Config(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=loop,
+        http=http,
+        proxy_headers=True,
+        timeout_graceful_shutdown=GRACEFUL_TIMEOUT,
+    )
+    server = GracefulServer(config)
+    if args.workers > 1:
+        sock = config.bind_socket()
+        Multiprocess(config, target=server.run, sockets=[sock]).run()
+    else:
+        server.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,7 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from ..deps import get_db
 from ..auth.security import get_current_admin
-from ..models import Application, Payment
-from sqlalchemy import func
+from ..models import Setting
 
 router = APIRouter()
 
@@ -0,0 +1,84 @@
+"""
+Per-request SQL accounting built on the engine hooks in app.db.
+
+While instrumentation is enabled, SQLTimingMiddleware attributes every
+statement to the current request and adds a Server-Timing header:
+
+    Server-Timing: db;dur=12.4;desc="7 queries", app;dur=31.0
+
+Requests that run the same normalized statement more than the repeat
+threshold are logged as likely N+1 patterns. Admins can switch the
+instrumentation and its thresholds at runtime (per worker).
+"""
+
+import logging
+import time
+
+from fastapi import APIRouter, Depends
+
+from . import schemas
+from .auth.security import get_current_admin
+from .db import QueryStats, current_query_stats, instrumentation
+
+logger = logging.getLogger("app.sql")
+
+
+class SQLTimingMiddleware:
+    """Pure ASGI middleware; only active while instrumentation is enabled."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not instrumentation.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                app_ms = (time.perf_counter() - start) * 1000
+                value = f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries", app;dur={app_ms:.1f}'
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", value.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_query_stats.reset(token)
+            for statement, count in stats.repeated(instrumentation.repeat_threshold):
+                route = getattr(scope.get("route"), "path", scope["path"])
+                logger.warning(
+                    "possible N+1: %s %s ran %d times: %s",
+                    scope["method"], route, count, statement,
+                )
+
+
+# ------------------- Admin toggle -------------------
+router = APIRouter(prefix="/admin/sql-instrumentation", tags=["admin"])
+
+
+def _current_settings():
+    return {
+        "enabled": instrumentation.enabled,
+        "slow_ms": instrumentation.slow_ms,
+        "repeat_threshold": instrumentation.repeat_threshold,
+    }
+
+
+@router.get("", response_model=schemas.SQLInstrumentationSettings)
+def get_sql_instrumentation(admin=Depends(get_current_admin)):
+    """Current SQL instrumentation settings of this worker (Admin only)."""
+    return _current_settings()
+
+
+@router.put("", response_model=schemas.SQLInstrumentationSettings)
+def update_sql_instrumentation(update: schemas.SQLInstrumentationUpdate, admin=Depends(get_current_admin)):
+    """Switch SQL instrumentation on or off and tune its thresholds (Admin only)."""
+    for key, value in update.model_dump(exclude_unset=True).items():
+        if value is not None:
+            setattr(instrumentation, key, value)
+    return _current_settings()
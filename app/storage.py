@@ -0,0 +1,162 @@
+"""
+Document storage backends.
+
+Uploads go to Vercel Blob (DOCUMENT_STORAGE=blob, the default) or to
+UPLOAD_DIR on local disk (DOCUMENT_STORAGE=local, for private storage
+that is only reachable through the API). Document.path holds the blob
+URL or the file path, and reads pick the backend from it, so documents
+stored before a switch stay readable.
+
+Reads are byte ranges streamed in DOCUMENT_CHUNK_SIZE pieces; nothing
+holds a whole file in memory.
+"""
+
+import hashlib
+import os
+import uuid
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+from urllib.parse import urlparse
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from .config import DOCUMENT_CHUNK_SIZE, DOCUMENT_STORAGE, UPLOAD_DIR
+
+BLOB_TOKEN = os.getenv("BLOB_READ_WRITE_TOKEN")
+BLOB_API_URL = "https://blob.vercel-storage.com/upload"
+
+
+@dataclass
+class StoredObject:
+    path: str
+    size: int
+    content_type: Optional[str]
+    checksum: str  # sha256, hex
+
+
+def _is_url(path: str) -> bool:
+    return path.startswith(("http://", "https://"))
+
+
+def _blob_headers(url: str) -> dict:
+    # private blobs need the store token; never send it to other hosts
+    if BLOB_TOKEN and (urlparse(url).hostname or "").endswith(".blob.vercel-storage.com"):
+        return {"Authorization": f"Bearer {BLOB_TOKEN}"}
+    return {}
+
+
+def _local_path(path: str) -> str:
+    """Resolve a stored path, refusing anything outside UPLOAD_DIR."""
+    root = os.path.realpath(UPLOAD_DIR)
+    resolved = os.path.realpath(path)
+    if os.path.commonpath([root, resolved]) != root:
+        raise PermissionError(f"{path} is outside the upload directory")
+    return resolved
+
+
+# ------------------- Writing -------------------
+async def save(file: UploadFile, folder: str) -> StoredObject:
+    """Store an upload and return where it went, with its size and checksum."""
+    if DOCUMENT_STORAGE == "local":
+        return await _save_local(file, folder)
+    return await _save_blob(file)
+
+
+async def _save_local(file: UploadFile, folder: str) -> StoredObject:
+    # a random name: client file names may collide or contain path parts
+    extension = os.path.splitext(file.filename or "")[1][:16]
+    path = os.path.join(UPLOAD_DIR, folder, f"{uuid.uuid4().hex}{extension}")
+    # file I/O and hashing block, so the whole copy runs in the threadpool
+    size, checksum = await run_in_threadpool(_copy_to_disk, file.file, path)
+    return StoredObject(path, size, file.content_type, checksum)
+
+
+def _copy_to_disk(source, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    source.seek(0)
+    digest, size = hashlib.sha256(), 0
+    with open(path, "wb") as fh:
+        while chunk := source.read(DOCUMENT_CHUNK_SIZE):
+            digest.update(chunk)
+            size += len(chunk)
+            fh.write(chunk)
+    return size, digest.hexdigest()
+
+
+async def _save_blob(file: UploadFile) -> StoredObject:
+    if not BLOB_TOKEN:
+        raise RuntimeError("Missing BLOB_READ_WRITE_TOKEN environment variable")
+    file_bytes = await file.read()
+
+    import httpx
+
+    async with httpx.AsyncClient() as client:
+        files = {"file": (file.filename, file_bytes, file.content_type)}
+        headers = {"Authorization": f"Bearer {BLOB_TOKEN}"}
+        resp = await client.post(BLOB_API_URL, files=files, headers=headers)
+    if resp.status_code != 200:
+        raise RuntimeError(f"Vercel Blob upload failed: {resp.text}")
+    return StoredObject(resp.json()["url"], len(file_bytes), file.content_type, hashlib.sha256(file_bytes).hexdigest())
+
+
+# ------------------- Reading -------------------
+async def size(path: str) -> int:
+    """
+    Object size, for documents stored before sizes were recorded. Raises
+    FileNotFoundError when the object is gone or refused (an OSError,
+    like the errors of local files).
+    """
+    if not _is_url(path):
+        return await run_in_threadpool(os.path.getsize, _local_path(path))
+
+    import httpx
+
+    async with httpx.AsyncClient() as client:
+        resp = await client.head(path, headers=_blob_headers(path), follow_redirects=True)
+    if resp.is_error or "content-length" not in resp.headers:
+        raise FileNotFoundError(f"{path}: HTTP {resp.status_code}")
+    return int(resp.headers["content-length"])
+
+
+async def read_range(path: str, start: int, end: int) -> AsyncIterator[bytes]:
+    """Yield bytes start..end (inclusive) of the object in chunks."""
+    if _is_url(path):
+        async for chunk in _read_url_range(path, start, end):
+            yield chunk
+        return
+    fh = await run_in_threadpool(open, _local_path(path), "rb")
+    try:
+        await run_in_threadpool(fh.seek, start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await run_in_threadpool(fh.read, min(DOCUMENT_CHUNK_SIZE, remaining))
+            if not chunk:
+                return
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        await run_in_threadpool(fh.close)
+
+
+async def _read_url_range(url: str, start: int, end: int) -> AsyncIterator[bytes]:
+    import httpx
+
+    headers = {**_blob_headers(url), "Range": f"bytes={start}-{end}"}
+    async with httpx.AsyncClient(follow_redirects=True) as client:
+        async with client.stream("GET", url, headers=headers) as resp:
+            resp.raise_for_status()
+            # an origin that ignores Range sends everything from byte 0
+            skip = start if resp.status_code == 200 else 0
+            remaining = end - start + 1
+            async for chunk in resp.aiter_raw(DOCUMENT_CHUNK_SIZE):
+                if skip:
+                    dropped = min(skip, len(chunk))
+                    chunk, skip = chunk[dropped:], skip - dropped
+                if not chunk:
+                    continue
+                chunk = chunk[:remaining]
+                remaining -= len(chunk)
+                yield chunk
+                if remaining <= 0:
+                    return
@@ -1 +0,0 @@
-# API version 1
\ No newline at end of file
@@ -1 +0,0 @@
-# Applications module for API v1
\ No newline at end of file
@@ -1 +0,0 @@
-# Auth module for API v1
\ No newline at end of file
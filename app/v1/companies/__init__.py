@@ -1 +0,0 @@
-# Companies module
\ No newline at end of file
@@ -1 +0,0 @@
-# Reports module for API v1
\ No newline at end of file
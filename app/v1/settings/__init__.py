@@ -1 +0,0 @@
-# Settings module for API v1
\ No newline at end of file
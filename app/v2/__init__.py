@@ -1,2 +0,0 @@
-# API version 2
-# Initially identical to v1
\ No newline at end of file
@@ -1,2 +0,0 @@
-# Applications module for API v2
-# Initially identical to v1
\ No newline at end of file
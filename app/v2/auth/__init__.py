@@ -1,2 +0,0 @@
-# Auth module for API v2
-# Initially identical to v1
\ No newline at end of file
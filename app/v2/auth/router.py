@@ -1,73 +0,0 @@
-"""
-Auth routes for v2 API.
-Initially identical to v1.
-"""
-
-from fastapi import APIRouter, Depends, HTTPException,status
-from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from ... import crud, schemas
-from ...deps import get_db
-from .security import verify_password, create_access_token, get_current_user,get_current_admin
-
-router = APIRouter()
-
-
-# -------- Register --------
-@router.post("/register", response_model=schemas.UserOut)
-def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    if crud.get_user_by_email(db, user.email):
-        raise HTTPException(status_code=400, detail="Email already registered")
-    return crud.create_user(db, user)
-
-
-# -------- Login --------
-@router.post("/token")
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = crud.get_user_by_email(db, form_data.username)
-    if not user or not verify_password(form_data.password, user.password_hash):
-        raise HTTPException(status_code=401, detail="Invalid credentials")
-
-    token = create_access_token(user.id) 
-    return {"access_token": token, "token_type": "bearer"}
-
-
-# -------- Current User --------
-@router.get("/me", response_model=schemas.UserOut)
-def get_me(current_user=Depends(get_current_user)):
-    return current_user
-
-
-
-# ---- List all users ----
-@router.get("/users", response_model=list[schemas.UserOut])
-def list_users(db: Session = Depends(get_db), admin=Depends(get_current_admin)):
-    return db.query(User).all()
-
-
-# ---- Update user ----
-@router.put("/users/{user_id}", response_model=schemas.UserOut)
-def update_user(user_id: int, user_update: schemas.UserUpdate, 
-                db: Session = Depends(get_db), admin=Depends(get_current_admin)):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    for key, value in user_update.dict(exclude_unset=True).items():
-        setattr(user, key, value)
-
-    db.commit()
-    db.refresh(user)
-    return user
-
-
-# ---- Delete user ----
-@router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user(user_id: int, db: Session = Depends(get_db), admin=Depends(get_current_admin)):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    db.delete(user)
-    db.commit()
-    return
\ No newline at end of file
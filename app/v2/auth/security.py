@@ -1,68 +0,0 @@
-"""
-Security utilities for v2 API authentication.
-Initially identical to v1.
-"""
-
-from passlib.context import CryptContext
-from datetime import datetime, timedelta
-from jose import jwt, JWTError
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from ...config import JWT_SECRET, JWT_ALGORITHM, JWT_EXPIRES_MIN
-from ...deps import get_db
-from ...models import User
-
-pwd_ctx = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-# OAuth2 scheme (points to /auth/token endpoint)
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token")
-
-
-# ---------------- Password utils ----------------
-def hash_password(password: str) -> str:
-    return pwd_ctx.hash(password)
-
-
-def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_ctx.verify(plain, hashed)
-
-
-# ---------------- JWT utils ----------------
-def create_access_token(user_id: int):
-    expire = datetime.utcnow() + timedelta(minutes=JWT_EXPIRES_MIN)
-    to_encode = {"sub": str(user_id), "exp": expire}
-    return jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
-
-
-# ---------------- Dependencies ----------------
-def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-
-    try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        sub = payload.get("sub")
-        if sub is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-
-    # now sub is user.id
-    user = db.query(User).filter(User.id == int(sub)).first()
-    if user is None:
-        raise credentials_exception
-    return user
-
-
-def get_current_admin(current_user: User = Depends(get_current_user)):
-    if current_user.role != "ADMIN":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required"
-        )
-    return current_user
\ No newline at end of file
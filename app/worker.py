@@ -0,0 +1,119 @@
+"""
+Background job worker.
+
+Runs jobs queued in the jobs table (see app/jobs/handlers.py) outside the
+request cycle, so they are not bound by HTTP or serverless timeouts:
+
+    python -m app.worker [--concurrency 4] [--once]
+
+Any number of workers can run against the same Postgres database; jobs are
+claimed with SELECT ... FOR UPDATE SKIP LOCKED, so each runs once. While
+a handler runs, a heartbeat thread renews the job's lease every
+JOB_HEARTBEAT_INTERVAL; a job whose worker died is reclaimed once the
+lease is JOB_LOCK_TIMEOUT old. Every later write is guarded by the
+claiming worker's id, so the old worker cannot overwrite the new
+attempt. SIGTERM and SIGINT stop claiming new jobs and let running ones
+finish.
+"""
+
+import argparse
+import json
+import logging
+import os
+import signal
+import socket
+import threading
+import traceback
+
+from . import crud
+from .config import JOB_CONCURRENCY, JOB_HEARTBEAT_INTERVAL, JOB_LOCK_TIMEOUT, JOB_POLL_INTERVAL, JOB_RETRY_BASE_SECONDS
+from .db import SessionLocal
+from .jobs.handlers import HANDLERS, JobContext
+
+logger = logging.getLogger("app.worker")
+
+
+def heartbeat(job, done: threading.Event) -> None:
+    """Renew the job's lease until `done` is set, so long handlers are not reclaimed."""
+    while not done.wait(JOB_HEARTBEAT_INTERVAL):
+        db = SessionLocal()
+        try:
+            if not crud.renew_job_lease(db, job.id, job.locked_by):
+                logger.warning("job %s (%s) lease lost; another worker may be running it", job.id, job.kind)
+                return
+        except Exception:
+            logger.exception("job %s (%s) lease renewal failed", job.id, job.kind)
+        finally:
+            db.close()
+
+
+def run_job(job) -> None:
+    """Run one claimed job and record its outcome."""
+    db = SessionLocal()
+    done = threading.Event()
+    threading.Thread(target=heartbeat, args=(job, done), name=f"job-{job.id}-heartbeat", daemon=True).start()
+    try:
+        handler = HANDLERS.get(job.kind)
+        if handler is None:
+            raise LookupError(f"No handler for job kind {job.kind!r}")
+        ctx = JobContext(db, job)
+        result = handler(ctx, json.loads(job.payload or "{}"))
+        if crud.finish_job(db, job.id, job.locked_by, result, ctx.artifact_path):
+            logger.info("job %s (%s) succeeded", job.id, job.kind)
+        else:
+            logger.warning("job %s (%s) finished after its lease was lost; result discarded", job.id, job.kind)
+    except crud.LeaseLost:
+        db.rollback()
+        logger.warning("job %s (%s) was reclaimed by another worker; stopped", job.id, job.kind)
+    except Exception:
+        db.rollback()
+        logger.exception("job %s (%s) failed, attempt %s of %s", job.id, job.kind, job.attempts, job.max_attempts)
+        if not crud.fail_job(db, job.id, job.locked_by, traceback.format_exc(limit=5), JOB_RETRY_BASE_SECONDS):
+            logger.warning("job %s (%s) failure not recorded: its lease was lost", job.id, job.kind)
+    finally:
+        done.set()
+        db.close()
+
+
+def work(worker_id: str, stop: threading.Event, once: bool = False):
+    """Claim and run jobs until `stop` is set (or, with once, the queue is empty)."""
+    while not stop.is_set():
+        db = SessionLocal()
+        try:
+            job = crud.claim_job(db, worker_id, JOB_LOCK_TIMEOUT)
+        finally:
+            db.close()
+        if job is not None:
+            run_job(job)
+        elif once:
+            return
+        else:
+            stop.wait(JOB_POLL_INTERVAL)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run queued background jobs")
+    parser.add_argument("--concurrency", type=int, default=JOB_CONCURRENCY)
+    parser.add_argument("--once", action="store_true", help="exit when no job is due")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
+    stop = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stop.set())
+
+    prefix = f"{socket.gethostname()}:{os.getpid()}"
+    threads = [
+        threading.Thread(target=work, args=(f"{prefix}:{n}", stop, args.once), name=f"job-worker-{n}")
+        for n in range(args.concurrency)
+    ]
+    logger.info("worker %s started with %d slots", prefix, args.concurrency)
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        while thread.is_alive():
+            thread.join(timeout=1)  # keeps the main thread responsive to signals
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Cold-start import benchmark for the serverless entry point.
+
+Imports app.main in fresh interpreters under `python -X importtime`,
+reports the median cumulative import time and the slowest modules, and
+exits non-zero when the median exceeds the budget or when a module that
+must stay lazy (see DEFERRED) is imported at startup.
+
+Run from the repo root:
+    python -m benchmarks.bench_import_time [--budget-ms 1500] [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ENTRY_POINT = "app.main"
+
+# Imported on first use only; pulling one of these in at startup is a regression.
+DEFERRED = ("jose", "passlib", "bcrypt", "httpx")
+
+
+def import_profile(module: str):
+    """Return {module: cumulative_us} for one cold import of `module`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(proc.stderr)
+
+    profile = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        profile[name.strip()] = int(cumulative_us)
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import benchmark")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", "1500")))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    import_profile(ENTRY_POINT)  # warm-up: writes .pyc files, fills the page cache
+    profiles = [import_profile(ENTRY_POINT) for _ in range(args.runs)]
+    totals_ms = [p[ENTRY_POINT] / 1000 for p in profiles]
+    median_ms = statistics.median(totals_ms)
+
+    last = profiles[-1]
+    slowest = sorted(
+        ((name, us / 1000) for name, us in last.items() if "." not in name or name.startswith("app.")),
+        key=lambda item: item[1],
+        reverse=True,
+    )[: args.top]
+    eager = sorted({name.split(".")[0] for name in last} & set(DEFERRED))
+
+    if args.json:
+        print(json.dumps({
+            "entry_point": ENTRY_POINT,
+            "median_ms": round(median_ms, 1),
+            "runs_ms": [round(t, 1) for t in totals_ms],
+            "budget_ms": args.budget_ms,
+            "slowest": {name: round(ms, 1) for name, ms in slowest},
+            "eager_deferred_imports": eager,
+        }, indent=2))
+    else:
+        print(f"{ENTRY_POINT}: median {median_ms:.1f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+        for name, ms in slowest:
+            print(f"  {ms:8.1f} ms  {name}")
+
+    failed = False
+    if eager:
+        print(f"FAIL: imported at startup but should be lazy: {', '.join(eager)}", file=sys.stderr)
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"FAIL: cold import {median_ms:.1f} ms exceeds budget {args.budget_ms:.0f} ms", file=sys.stderr)
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
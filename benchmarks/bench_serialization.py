@@ -0,0 +1,81 @@
+"""
+Compare the old and new serialization paths for list responses.
+
+Old: validate every ORM object into ApplicationOut one by one, run it
+through FastAPI's jsonable_encoder and encode with the stdlib json module.
+New: one cached TypeAdapter pass over the whole list straight to bytes.
+
+Run from the repo root:
+    python -m benchmarks.bench_serialization [--items 1000] [--repeat 20]
+"""
+
+import argparse
+import json
+import timeit
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from app import schemas
+from app.serialization import dump_list
+
+
+def make_rows(n: int):
+    return [
+        SimpleNamespace(
+            id=i,
+            council_waiting_list_number=f"WL-{i:06d}",
+            name=f"Name{i}",
+            surname=f"Surname{i}",
+            id_number=f"63-{i:07d}X42",
+            dob=date(1985, 1 + i % 12, 1 + i % 28),
+            residential_address=f"{i} Samora Machel Avenue, Harare " * 3,
+            contact_numbers="+263 77 000 0000",
+            employer="City of Harare",
+            department="Housing",
+            employment_number=f"EMP{i}",
+            employer_contact="+263 24 000 0000",
+            status="PENDING",
+            created_at=datetime(2025, 9, 1, 12, 0, 0),
+        )
+        for i in range(n)
+    ]
+
+
+def old_path(rows):
+    items = [schemas.ApplicationOut.model_validate(r) for r in rows]
+    return json.dumps(jsonable_encoder(items)).encode()
+
+
+def orjson_path(rows):
+    items = [schemas.ApplicationOut.model_validate(r) for r in rows]
+    return orjson.dumps([i.model_dump(mode="json") for i in items])
+
+
+def new_path(rows):
+    return dump_list(schemas.ApplicationOut, rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = make_rows(args.items)
+    assert json.loads(old_path(rows)) == json.loads(new_path(rows))
+
+    results = {}
+    for name, fn in [("jsonable_encoder+json", old_path), ("per-item+orjson", orjson_path), ("TypeAdapter", new_path)]:
+        best = min(timeit.repeat(lambda: fn(rows), number=1, repeat=args.repeat))
+        results[name] = best * 1000
+
+    baseline = results["jsonable_encoder+json"]
+    for name, ms in results.items():
+        print(f"{name:<24} {ms:8.2f} ms  ({baseline / ms:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
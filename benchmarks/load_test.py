@@ -0,0 +1,316 @@
+"""
+Reproducible API load test.
+
+Seeds a configurable dataset into a local database (SQLite file by default,
+or any DATABASE_URL such as a scratch Postgres), then drives the real
+FastAPI app in-process through httpx's ASGI transport, or an already
+running server with --base-url. Every scenario runs a fixed number of
+requests at the requested concurrency and reports throughput, latency
+percentiles and SQL statements per request as JSON, so two runs can be
+compared between commits:
+
+    python -m benchmarks.load_test --output before.json
+    python -m benchmarks.load_test --output after.json
+    python -m benchmarks.load_test --compare before.json after.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date
+
+PASSWORD = "bench-password"
+
+SCENARIOS = ("register", "login", "submit", "admin_list", "admin_list_sparse", "reports")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="API load test")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", "sqlite:///./bench.db"))
+    parser.add_argument("--base-url", default=None, help="drive a running server instead of the in-process app")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--apps-per-user", type=int, default=2)
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-reseed", action="store_true", help="reuse the existing dataset")
+    parser.add_argument("--output", default=None, help="write JSON results to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="diff two result files and exit")
+    return parser.parse_args(argv)
+
+
+# ---------------- Dataset ----------------
+def seed(args):
+    """Drop, recreate and fill the schema with a deterministic dataset."""
+    from sqlalchemy import insert
+
+    from app import models
+    from app.auth.security import hash_password
+    from app.db import Base, engine
+
+    rng = random.Random(args.seed)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    password_hash = hash_password(PASSWORD)
+    statuses = ["PENDING", "APPROVED", "REJECTED"]
+    with engine.begin() as conn:
+        conn.execute(insert(models.Company), [
+            {"id": i, "name": f"Company {i}", "is_active": 1} for i in range(1, 11)
+        ])
+        conn.execute(insert(models.User), [
+            {
+                "id": i,
+                "email": f"user{i}@example.com",
+                "first_name": "Bench",
+                "last_name": f"User{i}",
+                "password_hash": password_hash,
+                "role": "ADMIN" if i == 1 else "APPLICANT",
+                "company_id": 1 + i % 10,
+            }
+            for i in range(1, args.users + 1)
+        ])
+        apps, beneficiaries, payments = [], [], []
+        app_id = 0
+        for user_id in range(2, args.users + 1):
+            for _ in range(args.apps_per_user):
+                app_id += 1
+                number = rng.randint(1, 100000)
+                apps.append({
+                    "id": app_id,
+                    "user_id": user_id,
+                    "council_waiting_list_number": str(number),
+                    "waiting_list_key": number,
+                    "name": f"Name{app_id}",
+                    "surname": f"Surname{app_id}",
+                    "id_number": f"63-{app_id:07d}X42",
+                    "dob": date(1960 + app_id % 40, 1 + app_id % 12, 1 + app_id % 28),
+                    "residential_address": f"{app_id} Samora Machel Avenue, Harare",
+                    "contact_numbers": "+263 77 000 0000",
+                    "status": rng.choice(statuses),
+                })
+                beneficiaries += [
+                    {"application_id": app_id, "name": f"Child{k}", "dob": date(2010, 1, 1), "id_number": f"B{app_id}-{k}"}
+                    for k in range(rng.randint(0, 3))
+                ]
+                payments.append({
+                    "application_id": app_id,
+                    "amount": rng.choice([20.0, 50.0, 100.0]),
+                    "currency": "USD",
+                    "description": "Registration fee",
+                    "receipt_number": f"SEED-{app_id}",
+                })
+        if apps:
+            conn.execute(insert(models.Application), apps)
+        if beneficiaries:
+            conn.execute(insert(models.Beneficiary), beneficiaries)
+        if payments:
+            conn.execute(insert(models.Payment), payments)
+
+    from app.crud import rebuild_waiting_list
+    from app.db import SessionLocal
+
+    with SessionLocal() as db:
+        rebuild_waiting_list(db)
+
+
+# ---------------- Requests ----------------
+def application_payload(n: int, with_children: bool = True):
+    payload = {
+        "name": f"Load{n}",
+        "surname": "Test",
+        "id_number": f"LT-{n}",
+        "dob": "1990-01-01",
+        "residential_address": "1 Test Road, Harare",
+        "contact_numbers": "+263 77 000 0000",
+    }
+    if with_children:
+        payload.update({
+            "next_of_kin": {
+                "name": "Kin", "surname": "Test", "id_number": f"K-{n}",
+                "dob": "1970-01-01", "relation": "Parent",
+            },
+            "beneficiaries": [
+                {"name": f"Child{k}", "dob": "2015-01-01", "id_number": f"C-{n}-{k}"} for k in range(2)
+            ],
+            "payments": [
+                {"amount": 50.0, "description": "Registration fee", "receipt_number": f"LT-{n}-{time.time_ns()}"}
+            ],
+        })
+    return payload
+
+
+async def login(client, email):
+    r = await client.post("/api/v1/token", data={"username": email, "password": PASSWORD})
+    r.raise_for_status()
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def scenario_requests(name, n, ctx):
+    """Return (method, url, kwargs) for request number n of a scenario."""
+    if name == "register":
+        email = f"new{ctx['run_id']}-{n}@example.com"
+        return "POST", "/api/v1/register", {"json": {
+            "email": email, "first_name": "New", "last_name": "User", "password": PASSWORD,
+        }}
+    if name == "login":
+        email = f"user{2 + n % max(ctx['users'] - 1, 1)}@example.com"
+        return "POST", "/api/v1/token", {"data": {"username": email, "password": PASSWORD}}
+    if name == "submit":
+        return "POST", "/api/v1/applications/submit", {
+            "json": application_payload(n), "headers": ctx["applicant"],
+        }
+    if name == "admin_list":
+        skip = (n * 100) % max(ctx["apps"], 1)
+        return "GET", f"/api/v1/applications/?skip={skip}&limit=100", {"headers": ctx["admin"]}
+    if name == "admin_list_sparse":
+        skip = (n * 100) % max(ctx["apps"], 1)
+        return "GET", (
+            f"/api/v1/applications/?skip={skip}&limit=100"
+            "&fields=id,name,surname,status,created_at&count=cached"
+        ), {"headers": ctx["admin"]}
+    if name == "reports":
+        url = "/api/v1/applications/status" if n % 2 == 0 else "/api/v1/payments/summary"
+        return "GET", url, {"headers": ctx["admin"]}
+    raise ValueError(f"Unknown scenario {name}")
+
+
+async def run_scenario(client, name, args, ctx, query_counter):
+    latencies, errors = [], 0
+    counter = iter(range(args.requests))
+    lock = asyncio.Lock()
+
+    async def worker():
+        nonlocal errors
+        while True:
+            async with lock:
+                n = next(counter, None)
+            if n is None:
+                return
+            method, url, kwargs = scenario_requests(name, n, ctx)
+            start = time.perf_counter()
+            r = await client.request(method, url, **kwargs)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if r.status_code >= 400:
+                errors += 1
+
+    queries_before = query_counter[0]
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    queries = query_counter[0] - queries_before
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(round(p / 100 * (len(latencies) - 1))))]
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+        "p50_ms": round(pct(50), 2),
+        "p95_ms": round(pct(95), 2),
+        "p99_ms": round(pct(99), 2),
+        "queries_per_request": round(queries / len(latencies), 2) if args.base_url is None else None,
+    }
+
+
+async def run(args):
+    import httpx
+
+    query_counter = [0]
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+    else:
+        from sqlalchemy import event
+
+        from app.db import engine
+        from app.main import app
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def count_query(*_):
+            query_counter[0] += 1
+
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+    async with client:
+        ctx = {
+            "run_id": time.time_ns(),
+            "users": args.users,
+            "apps": max(args.users - 1, 0) * args.apps_per_user,
+            "admin": await login(client, "user1@example.com"),
+            "applicant": await login(client, "user2@example.com"),
+        }
+        results = {}
+        for name in args.scenarios.split(","):
+            results[name] = await run_scenario(client, name.strip(), args, ctx, query_counter)
+            print(f"{name:<20} {json.dumps(results[name])}", file=sys.stderr)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+
+def compare(old_path, new_path):
+    old, new = (json.load(open(p)) for p in (old_path, new_path))
+    print(f"{'scenario':<20} {'metric':<20} {'old':>10} {'new':>10} {'change':>8}")
+    for name, new_stats in new["scenarios"].items():
+        old_stats = old["scenarios"].get(name)
+        if not old_stats:
+            continue
+        for metric in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms", "queries_per_request"):
+            a, b = old_stats.get(metric), new_stats.get(metric)
+            if a is None or b is None:
+                continue
+            change = f"{(b - a) / a * 100:+.1f}%" if a else "n/a"
+            print(f"{name:<20} {metric:<20} {a:>10} {b:>10} {change:>8}")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    # app.config reads DATABASE_URL at import time
+    if args.base_url is None:
+        os.environ["DATABASE_URL"] = args.database_url
+        # every simulated client shares one address; measure the endpoints, not the limiter
+        os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+        if not args.no_reseed:
+            seed(args)
+
+    results = asyncio.run(run(args))
+    report = {
+        "commit": git_commit(),
+        "config": {
+            "database": args.database_url.split("://")[0] if args.base_url is None else None,
+            "base_url": args.base_url,
+            "users": args.users,
+            "apps_per_user": args.apps_per_user,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+        },
+        "scenarios": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import pytest
+
+from tests.conftest import APPLICATION
+
+
+@pytest.fixture
+def admin(make_user):
+    return make_user("admin@example.com", admin=True)
+
+
+@pytest.fixture
+def applicant(make_user):
+    return make_user("applicant@example.com")
+
+
+def _submit(client, headers) -> dict:
+    resp = client.post("/api/v1/applications/", json=APPLICATION, headers=headers)
+    assert resp.status_code == 200, resp.text
+    return resp.json()
+
+
+def test_v1_status_change_with_stale_version_conflicts(client, admin, applicant):
+    app = _submit(client, applicant)
+    url = f"/api/v1/applications/{app['id']}/status"
+    resp = client.put(url, json={"status": "APPROVED", "version": app["version"]}, headers=admin)
+    assert resp.status_code == 200 and resp.json()["version"] == app["version"] + 1
+    # a second reviewer still looking at the old version
+    resp = client.put(url, json={"status": "PENDING", "version": app["version"]}, headers=admin)
+    assert resp.status_code == 409
+
+
+def test_v2_status_change_with_stale_version_conflicts(client, admin, applicant):
+    app = _submit(client, applicant)
+    url = f"/api/v2/applications/admin/{app['id']}/status"
+    assert client.put(url, params={"status": "REJECTED", "version": app["version"]}, headers=admin).status_code == 200
+    assert client.put(url, params={"status": "PENDING", "version": app["version"]}, headers=admin).status_code == 409
+
+
+@pytest.mark.parametrize("body", [
+    {"status": "APPROVED", "version": "abc"},
+    {"status": "APPROVED", "version": [1]},
+    {"version": 1},
+])
+def test_v1_status_body_is_validated(client, admin, applicant, body):
+    app = _submit(client, applicant)
+    assert client.put(f"/api/v1/applications/{app['id']}/status", json=body, headers=admin).status_code == 422
+
+
+def test_invalid_status_transition_is_rejected(client, admin, applicant):
+    app = _submit(client, applicant)
+    resp = client.put(f"/api/v1/applications/{app['id']}/status", json={"status": "BOGUS"}, headers=admin)
+    assert resp.status_code == 400
+
+
+@pytest.mark.parametrize("body", [
+    {"status": "APPROVED"},
+    {"status": "APPROVED", "ids": []},
+    {"status": "APPROVED", "filter": {}},
+    {"status": "APPROVED", "ids": [1], "filter": {"status": "PENDING"}},
+])
+def test_bulk_status_needs_exactly_one_selection(client, admin, body):
+    assert client.post("/api/v1/applications/status/bulk", json=body, headers=admin).status_code == 422
+
+
+def test_bulk_status_by_ids_and_by_filter(client, admin, applicant):
+    first, second, third = (_submit(client, applicant) for _ in range(3))
+    resp = client.post(
+        "/api/v1/applications/status/bulk", json={"status": "APPROVED", "ids": [first["id"]]}, headers=admin
+    )
+    assert resp.status_code == 200 and resp.json()["updated_ids"] == [first["id"]]
+    resp = client.post(
+        "/api/v1/applications/status/bulk", json={"status": "REJECTED", "filter": {"status": "PENDING"}}, headers=admin
+    )
+    assert resp.status_code == 200 and resp.json()["updated_ids"] == [second["id"], third["id"]]
+
+
+def test_queue_positions_follow_bulk_changes(client, admin, applicant):
+    ids = [
+        client.post("/api/v1/applications/", json={**APPLICATION, "council_waiting_list_number": number}, headers=applicant).json()["id"]
+        for number in ("HR/30", None, "HR/10")
+    ]
+
+    def positions():
+        return [client.get(f"/api/v1/applications/{i}/position", headers=applicant).json()["position"] for i in ids]
+
+    assert positions() == [2, 3, 1]
+    client.post("/api/v1/applications/status/bulk", json={"status": "APPROVED", "ids": [ids[2]]}, headers=admin)
+    assert positions() == [1, 2, None]
@@ -0,0 +1,24 @@
+import pytest
+
+from app.conditional import parse_range
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=900-5000", (900, 999)),
+    ("bytes=0-1,5-6", None),  # multiple ranges are served whole
+    ("items=0-1", None),
+    ("bytes=5-1", None),
+    ("bytes=a-b", None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header, size", [("bytes=1000-", 1000), ("bytes=-0", 1000), ("bytes=-10", 0)])
+def test_unsatisfiable_range(header, size):
+    with pytest.raises(ValueError):
+        parse_range(header, size)
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from app import events, models
+from app.db import SessionLocal
+
+
+@pytest.mark.postgres
+def test_notify_reaches_the_broker_of_this_worker(db, monkeypatch):
+    monkeypatch.setattr(events, "EVENTS_PG_NOTIFY", True)
+    owner = models.User(email="events@example.com", password_hash="x")
+    db.add(owner)
+    db.commit()
+    events.start_listener()
+
+    async def receive():
+        queue = events.broker.subscribe(owner.id)
+        try:
+            # the listener may not be LISTENing yet, so publish until one arrives
+            for n in range(50):
+                session = SessionLocal()
+                try:
+                    events.publish(session, [{"id": n, "user_id": owner.id, "application_id": 1, "status": "APPROVED"}])
+                    session.commit()
+                finally:
+                    session.close()
+                try:
+                    return await asyncio.wait_for(queue.get(), 0.2)
+                except asyncio.TimeoutError:
+                    continue
+        finally:
+            events.broker.unsubscribe(owner.id, queue)
+
+    item = asyncio.run(receive())
+    assert item is not None and item["user_id"] == owner.id and item["status"] == "APPROVED"
+
+
+def test_events_are_dispatched_only_after_commit(db):
+    async def run():
+        queue = events.broker.subscribe(7)
+        try:
+            session = SessionLocal()
+            session.execute(select(1))  # publish() runs inside a writing transaction
+            events.publish(session, [{"id": 1, "user_id": 7, "application_id": 1, "status": "REJECTED"}])
+            session.rollback()
+            session.execute(select(1))
+            events.publish(session, [{"id": 2, "user_id": 7, "application_id": 1, "status": "APPROVED"}])
+            session.commit()
+            session.close()
+            return await asyncio.wait_for(queue.get(), 1)
+        finally:
+            events.broker.unsubscribe(7, queue)
+
+    assert asyncio.run(run())["id"] == 2
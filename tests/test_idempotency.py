@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+
+from app import crud, models
+from tests.conftest import APPLICATION
+
+
+def test_retry_replays_the_stored_response(client, make_user):
+    headers = {**make_user("idem@example.com"), "Idempotency-Key": "submit-1"}
+    first = client.post("/api/v1/applications/", json=APPLICATION, headers=headers)
+    retry = client.post("/api/v1/applications/", json=APPLICATION, headers=headers)
+    assert first.status_code == retry.status_code == 200
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert retry.json() == first.json()
+    assert len(client.get("/api/v1/applications/me", headers=headers).json()) == 1
+
+
+def test_key_reused_for_a_different_request_is_rejected(client, make_user):
+    headers = {**make_user("idem@example.com"), "Idempotency-Key": "submit-1"}
+    assert client.post("/api/v1/applications/", json=APPLICATION, headers=headers).status_code == 200
+    resp = client.post("/api/v1/applications/", json={**APPLICATION, "name": "Other"}, headers=headers)
+    assert resp.status_code == 422
+    # the query string is part of the request too
+    resp = client.post("/api/v1/applications/?draft=1", json=APPLICATION, headers=headers)
+    assert resp.status_code == 422
+
+
+def test_takeover_clears_the_old_response_and_fences_the_old_claim(db, make_user):
+    make_user("idem@example.com")
+    user = crud.get_user_by_email(db, "idem@example.com")
+    old, claimed = crud.claim_idempotency_key(db, user.id, "k", "POST", "/x", "hash", ttl_seconds=60, lock_timeout=10)
+    assert claimed
+    db.refresh(old)
+    old_claim = old.locked_at
+    # the first request died after part of its response was written
+    db.execute(
+        update(models.IdempotencyKey)
+        .where(models.IdempotencyKey.id == old.id)
+        .values(
+            response_status=201, response_headers='[["location", "/old"]]',
+            locked_at=datetime.now(timezone.utc) - timedelta(seconds=60),
+        )
+    )
+    db.commit()
+
+    new, claimed = crud.claim_idempotency_key(db, user.id, "k", "POST", "/x", "hash", ttl_seconds=60, lock_timeout=10)
+    assert claimed
+    assert new.response_status is None and new.response_headers is None
+
+    crud.complete_idempotency_key(db, old.id, old_claim, 200, "application/json", b"old")
+    crud.release_idempotency_key(db, old.id, old_claim)
+    db.refresh(new)
+    assert new.status == "IN_PROGRESS" and new.response_body is None
+
+    crud.complete_idempotency_key(db, new.id, new.locked_at, 201, "application/json", b"new")
+    db.refresh(new)
+    assert new.status == "COMPLETED" and new.response_body == b"new"
@@ -0,0 +1,141 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select, update
+
+from app import crud, models, worker
+from app.db import SessionLocal
+from app.jobs.handlers import HANDLERS, JobContext
+
+
+def _expire_lease(db, job_id):
+    db.execute(
+        update(models.Job)
+        .where(models.Job.id == job_id)
+        .values(locked_at=datetime.now(timezone.utc) - timedelta(seconds=600))
+    )
+    db.commit()
+
+
+def test_claimed_job_is_not_claimed_again(db):
+    job = crud.enqueue_job(db, "purge_tombstones")
+    first = crud.claim_job(db, "w1", lock_timeout=60)
+    assert first.id == job.id and first.status == "RUNNING" and first.locked_by == "w1"
+    assert crud.claim_job(db, "w2", lock_timeout=60) is None
+
+
+def test_old_worker_cannot_write_after_takeover(db):
+    crud.enqueue_job(db, "purge_tombstones")
+    job = crud.claim_job(db, "w1", lock_timeout=60)
+    _expire_lease(db, job.id)
+    reclaimed = crud.claim_job(db, "w2", lock_timeout=60)
+    assert reclaimed.id == job.id and reclaimed.attempts == 2
+
+    with pytest.raises(crud.LeaseLost):
+        crud.update_job_progress(db, job.id, "w1", 0.5)
+    assert not crud.renew_job_lease(db, job.id, "w1")
+    assert not crud.finish_job(db, job.id, "w1", {"stale": True})
+    assert not crud.fail_job(db, job.id, "w1", "boom", retry_base_seconds=1)
+
+    assert crud.finish_job(db, job.id, "w2", {"ok": True})
+    db.expire_all()
+    finished = db.get(models.Job, job.id)
+    assert finished.status == "SUCCEEDED" and finished.result == '{"ok": true}'
+
+
+def test_stale_job_without_attempts_left_is_failed(db):
+    job = crud.enqueue_job(db, "purge_tombstones", max_attempts=1)
+    crud.claim_job(db, "w1", lock_timeout=60)
+    _expire_lease(db, job.id)
+    assert crud.claim_job(db, "w2", lock_timeout=60) is None
+    db.expire_all()
+    failed = db.get(models.Job, job.id)
+    assert failed.status == "FAILED" and failed.locked_by is None
+
+
+def test_failed_attempt_is_requeued_with_backoff(db):
+    job = crud.enqueue_job(db, "purge_tombstones", max_attempts=2)
+    crud.claim_job(db, "w1", lock_timeout=60)
+    assert crud.fail_job(db, job.id, "w1", "boom", retry_base_seconds=60)
+    db.expire_all()
+    queued = db.get(models.Job, job.id)
+    assert queued.status == "QUEUED" and queued.error == "boom"
+    assert crud.claim_job(db, "w1", lock_timeout=60) is None  # not due yet
+
+
+def test_heartbeat_renews_lease_while_handler_runs(db, monkeypatch):
+    monkeypatch.setattr(worker, "JOB_HEARTBEAT_INTERVAL", 0.05)
+    seen = {}
+
+    def slow(ctx: JobContext, payload: dict):
+        check = SessionLocal()
+        try:
+            seen["before"] = check.scalar(select(models.Job.locked_at).where(models.Job.id == ctx.job.id))
+            time.sleep(0.3)
+            seen["after"] = check.scalar(select(models.Job.locked_at).where(models.Job.id == ctx.job.id))
+        finally:
+            check.close()
+
+    monkeypatch.setitem(HANDLERS, "slow", slow)
+    crud.enqueue_job(db, "slow")
+    worker.run_job(crud.claim_job(db, "w1", lock_timeout=60))
+    assert seen["after"] > seen["before"]
+
+
+def test_export_commits_progress_between_pages(db):
+    # on Postgres this also covers progress commits not closing a read cursor
+    owner = models.User(email="export@example.com", password_hash="x")
+    db.add(owner)
+    db.flush()
+    db.add_all(
+        models.Application(user_id=owner.id, name="A", surname="B", id_number=str(n), residential_address="x", contact_numbers="0")
+        for n in range(2500)
+    )
+    db.commit()
+    job = crud.enqueue_job(db, "export_applications")
+    worker.run_job(crud.claim_job(db, "w1", lock_timeout=60))
+    db.expire_all()
+    done = db.get(models.Job, job.id)
+    assert done.status == "SUCCEEDED", done.error
+    assert done.result == '{"rows": 2500}' and done.progress == 1.0
+
+
+@pytest.mark.postgres
+def test_skip_locked_hands_concurrent_workers_different_jobs(db):
+    first = crud.enqueue_job(db, "purge_tombstones")
+    second = crud.enqueue_job(db, "purge_tombstones")
+    holder = SessionLocal()
+    try:
+        # a worker that is still between its SELECT ... FOR UPDATE and the claim
+        holder.execute(select(models.Job).where(models.Job.id == first.id).with_for_update())
+        claimed = crud.claim_job(db, "w2", lock_timeout=60)
+        assert claimed.id == second.id
+    finally:
+        holder.rollback()
+        holder.close()
+
+
+@pytest.mark.postgres
+def test_concurrent_claims_never_share_a_job(db):
+    for _ in range(20):
+        crud.enqueue_job(db, "purge_tombstones")
+    claimed, lock = [], threading.Lock()
+
+    def claim_all(worker_id):
+        session = SessionLocal()
+        try:
+            while (job := crud.claim_job(session, worker_id, lock_timeout=60)) is not None:
+                with lock:
+                    claimed.append(job.id)
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=claim_all, args=(f"w{n}",)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    claim_all("w-last")  # a worker may give up while the others hold the remaining rows
+    assert len(claimed) == len(set(claimed)) == 20